@@ -24,16 +24,23 @@ class SignalType(Enum):
 def parse_ticker_dataframe(ticker: list) -> DataFrame:
     """
     Analyses the trend for the given ticker history
-    :param ticker: See exchange.get_ticker_history
+    :param ticker: See exchange.get_ticker_history, or optimize.tickerdata.TickerColumns
     :return: DataFrame
     """
-    columns = {'C': 'close', 'V': 'volume', 'O': 'open', 'H': 'high', 'L': 'low', 'T': 'date'}
-    frame = DataFrame(ticker) \
-        .rename(columns=columns)
-    if 'BV' in frame:
-        frame.drop('BV', 1, inplace=True)
-    frame['date'] = to_datetime(frame['date'], utc=True, infer_datetime_format=True)
-    frame.sort_values('date', inplace=True)
+    if isinstance(ticker, list):
+        columns = {'C': 'close', 'V': 'volume', 'O': 'open', 'H': 'high', 'L': 'low',
+                   'T': 'date'}
+        frame = DataFrame(ticker) \
+            .rename(columns=columns)
+        if 'BV' in frame:
+            frame.drop('BV', 1, inplace=True)
+        frame['date'] = to_datetime(frame['date'], utc=True, infer_datetime_format=True)
+    else:
+        # TickerColumns, the frame shares their (memory-mapped) arrays
+        frame = ticker.to_dataframe()
+    # Sorting copies every column, sorted ticker histories are kept as they are
+    if not frame['date'].is_monotonic_increasing:
+        frame.sort_values('date', inplace=True)
     return frame
 
 
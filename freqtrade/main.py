@@ -18,8 +18,8 @@ from freqtrade.analyze import get_signal
 from freqtrade.fiat_convert import CryptoToFiatConverter
 from freqtrade.misc import (State, get_state, load_config, parse_args,
                             throttle, update_state)
-from freqtrade.persistence import Trade
-from freqtrade.strategy.strategy import Strategy
+from freqtrade.persistence import ITrade, Trade
+from freqtrade.strategy.strategy import Strategy, StrategyParameters
 
 logger = logging.getLogger('freqtrade')
 
@@ -282,12 +282,14 @@ def execute_sell(trade: Trade, limit: float) -> None:
     Trade.session.flush()
 
 
-def min_roi_reached(trade: Trade, current_rate: float, current_time: datetime) -> bool:
+def min_roi_reached(trade: ITrade, current_rate: float, current_time: datetime,
+                    strategy: Optional[StrategyParameters] = None) -> bool:
     """
     Based an earlier trade and current price and ROI configuration, decides whether bot should sell
+    :param strategy: stoploss and ROI table to use, defaults to the Strategy
     :return True if bot should sell at current rate
     """
-    strategy = Strategy()
+    strategy = strategy or Strategy()
 
     current_profit = trade.calc_profit_percent(current_rate)
     if strategy.stoploss is not None and current_profit < strategy.stoploss:
@@ -295,33 +297,36 @@ def min_roi_reached(trade: Trade, current_rate: float, current_time: datetime) -
         return True
 
     # Check if time matches and current rate is above threshold
-    time_diff = (current_time.timestamp() - trade.open_date.timestamp()) / 60
-    for duration, threshold in strategy.minimal_roi.items():
-        if time_diff <= duration:
-            return False
-        if current_profit > threshold:
-            return True
-    return False
+    time_diff = (current_time - trade.open_date).total_seconds() / 60
+    bounds, thresholds = strategy.roi_table
+    return bool(current_profit > thresholds[bounds.searchsorted(time_diff)])
 
 
-def should_sell(trade: Trade, rate: float, date: datetime, buy: bool, sell: bool) -> bool:
+def should_sell(trade: ITrade, rate: float, date: datetime, buy: bool, sell: bool,
+                strategy: Optional[StrategyParameters] = None,
+                experimental: Optional[Dict] = None) -> bool:
     """
     This function evaluate if on the condition required to trigger a sell has been reached
     if the threshold is reached and updates the trade record.
+    :param strategy: stoploss and ROI table to use, defaults to the Strategy
+    :param experimental: experimental settings to use, defaults to the ones of the config
     :return: True if trade should be sold, False otherwise
     """
+    if experimental is None:
+        experimental = _CONF.get('experimental', {})
+
     # Check if minimal roi has been reached and no longer in buy conditions (avoiding a fee)
-    if min_roi_reached(trade, rate, date):
+    if min_roi_reached(trade, rate, date, strategy):
         logger.debug('Required profit reached. Selling..')
         return True
 
     # Experimental: Check if the trade is profitable before selling it (avoid selling at loss)
-    if _CONF.get('experimental', {}).get('sell_profit_only', False):
+    if experimental.get('sell_profit_only', False):
         logger.debug('Checking if trade is profitable..')
         if trade.calc_profit(rate=rate) <= 0:
             return False
 
-    if sell and not buy and _CONF.get('experimental', {}).get('use_sell_signal', False):
+    if sell and not buy and experimental.get('use_sell_signal', False):
         logger.debug('Sell signal received. Selling..')
         return True
 
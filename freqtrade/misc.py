@@ -65,6 +65,52 @@ def file_dump_json(filename, data) -> None:
         json.dump(data, fp)
 
 
+class JsonLinesWriter(object):
+    """
+    Writes one json document per line (JSON Lines).
+    Lines are buffered and written to the file every batch_size documents,
+    so a crash only loses the last batch.
+    """
+
+    def __init__(self, filename: str, batch_size: int = 1000, mode: str = 'w') -> None:
+        """
+        :param batch_size: number of documents to buffer, 1 writes every document at once
+        :param mode: 'w' to truncate the file, 'a' to append to it
+        """
+        self.filename = filename
+        self.batch_size = batch_size
+        self._buffer: List[str] = []
+        self._fp = open(filename, mode)
+
+    def write(self, data: Any) -> None:
+        """
+        Queues one document, flushes once batch_size documents are queued
+        :param data: json.dump friendly document
+        :return: None
+        """
+        self._buffer.append(json.dumps(data))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """ Writes the queued documents to the file """
+        if self._buffer:
+            self._fp.write('\n'.join(self._buffer) + '\n')
+            self._buffer = []
+        self._fp.flush()
+
+    def close(self) -> None:
+        """ Flushes the queued documents and closes the file """
+        self.flush()
+        self._fp.close()
+
+    def __enter__(self) -> 'JsonLinesWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
 @synchronized
 def update_state(state: State) -> None:
     """
@@ -228,6 +274,17 @@ def optimizer_shared_options(parser: argparse.ArgumentParser) -> None:
         type=str,
         dest='timerange',
     )
+    parser.add_argument(
+        '--profile',
+        help='print the time spent per phase and pair, also dumped as json \
+              if a FILE is given. Example --profile=profile.json',
+        nargs='?',
+        const='',
+        default=None,
+        type=str,
+        dest='profile',
+        metavar='FILE',
+    )
 
 
 def backtesting_options(parser: argparse.ArgumentParser) -> None:
@@ -252,6 +309,22 @@ def backtesting_options(parser: argparse.ArgumentParser) -> None:
         default=None,
         dest='export',
     )
+    parser.add_argument(
+        '--timeline',
+        help='with --realistic-simulation, allocate the max_open_trades slots in time order \
+              over all pairs instead of the whitelist order',
+        action='store_true',
+        dest='timeline',
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        help='number of threads loading the pairs and of processes populating their \
+              indicators and simulating them (default: %(default)d)',
+        dest='jobs',
+        default=1,
+        type=int,
+        metavar='INT',
+    )
 
 
 def hyperopt_options(parser: argparse.ArgumentParser) -> None:
@@ -278,6 +351,46 @@ def hyperopt_options(parser: argparse.ArgumentParser) -> None:
         nargs='+',
         dest='spaces',
     )
+    parser.add_argument(
+        '-j', '--jobs',
+        help='number of processes evaluating the epochs, without mongodb, and of \
+              threads and processes loading the pairs and populating their indicators \
+              (default: %(default)d)',
+        dest='jobs',
+        default=1,
+        type=int,
+        metavar='INT',
+    )
+    parser.add_argument(
+        '--halving',
+        help='evaluate the epochs with successive halving over INT rungs: only the best \
+              third of each rung is backtested on three times more data, without mongodb \
+              (default: %(default)d, disabled)',
+        dest='halving',
+        default=0,
+        type=int,
+        metavar='INT',
+    )
+    parser.add_argument(
+        '--batch',
+        help='suggest INT epochs at a time and backtest them together, in one pass over \
+              the signals when the buy space is not optimized, without mongodb and --jobs \
+              (default: %(default)d)',
+        dest='batch',
+        default=1,
+        type=int,
+        metavar='INT',
+    )
+    parser.add_argument(
+        '--progress',
+        help='log the throughput and latency of the epochs and refresh \
+              user_data/hyperopt_status.json every INT epochs, 0 to disable \
+              (default: %(default)d)',
+        dest='progress',
+        default=100,
+        type=int,
+        metavar='INT',
+    )
 
 
 def parse_timerange(text):
@@ -310,21 +423,34 @@ def parse_timerange(text):
     raise Exception('Incorrect syntax for timerange "%s"' % text)
 
 
+def start_backtesting(args: argparse.Namespace) -> None:
+    """ Runs the backtesting subcommand, its module is only imported when it is used """
+    from freqtrade.optimize import backtesting
+    backtesting.start(args)
+
+
+def start_hyperopt(args: argparse.Namespace) -> None:
+    """
+    Runs the hyperopt subcommand, its module is only imported when it is used:
+    it pulls in hyperopt, talib and the hyperopt configuration
+    """
+    from freqtrade.optimize import hyperopt
+    hyperopt.start(args)
+
+
 def build_subcommands(parser: argparse.ArgumentParser) -> None:
     """ Builds and attaches all subcommands """
-    from freqtrade.optimize import backtesting, hyperopt
-
     subparsers = parser.add_subparsers(dest='subparser')
 
     # Add backtesting subcommand
     backtesting_cmd = subparsers.add_parser('backtesting', help='backtesting module')
-    backtesting_cmd.set_defaults(func=backtesting.start)
+    backtesting_cmd.set_defaults(func=start_backtesting)
     optimizer_shared_options(backtesting_cmd)
     backtesting_options(backtesting_cmd)
 
     # Add hyperopt subcommand
     hyperopt_cmd = subparsers.add_parser('hyperopt', help='hyperopt module')
-    hyperopt_cmd.set_defaults(func=hyperopt.start)
+    hyperopt_cmd.set_defaults(func=start_hyperopt)
     optimizer_shared_options(hyperopt_cmd)
     hyperopt_options(hyperopt_cmd)
 
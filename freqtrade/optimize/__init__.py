@@ -2,20 +2,87 @@
 
 import logging
 import json
+import multiprocessing
 import os
-from typing import Optional, List, Dict
-from pandas import DataFrame
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Optional, List, Dict, Tuple, Union
+from pandas import DataFrame, Timestamp
 from freqtrade.exchange import get_ticker_history
 from freqtrade.analyze import populate_indicators, parse_ticker_dataframe
 
 from freqtrade import misc
+from freqtrade.optimize import profiler, tickerdata
+from freqtrade.strategy.strategy import Strategy
 from user_data.hyperopt_conf import hyperopt_optimize_conf
-import gzip
 
 logger = logging.getLogger(__name__)
 
 
+class PreprocessedData(dict):
+    """
+    Dictionary of pair -> DataFrame returned by preprocess().
+    Caches values computed over all pairs, like backtesting.get_timeframe(),
+    until a pair is added, replaced or removed
+    """
+    timeframe = None
+
+    def __setitem__(self, pair, pair_data) -> None:
+        self.timeframe = None
+        super().__setitem__(pair, pair_data)
+
+    def __delitem__(self, pair) -> None:
+        self.timeframe = None
+        super().__delitem__(pair)
+
+    def update(self, *args, **kwargs) -> None:
+        self.timeframe = None
+        super().update(*args, **kwargs)
+
+    def setdefault(self, pair, pair_data=None):
+        self.timeframe = None
+        return super().setdefault(pair, pair_data)
+
+    def pop(self, pair, *default):
+        self.timeframe = None
+        return super().pop(pair, *default)
+
+    def popitem(self):
+        self.timeframe = None
+        return super().popitem()
+
+    def clear(self) -> None:
+        self.timeframe = None
+        super().clear()
+
+
+def bisect_date(tickerlist, date: datetime) -> int:
+    """
+    Binary search of a ticker history sorted by date
+    :param date: naive UTC datetime
+    :return: index of the first ticker at or after date
+    """
+    if isinstance(tickerlist, tickerdata.TickerColumns):
+        # Only the pages of the memory-mapped dates visited by the search are read
+        return int(tickerlist.dates.searchsorted(Timestamp(date).value))
+    key = date.strftime(tickerdata.DATE_FORMAT)
+    low, high = 0, len(tickerlist)
+    while low < high:
+        middle = (low + high) // 2
+        if tickerlist[middle]['T'] < key:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
 def trim_tickerlist(tickerlist, timerange):
+    """
+    :param timerange: see misc.parse_timerange(), YYYYMMDD dates are UTC days,
+                      both the start and the stop day are included
+    :return: the part of the ticker history within timerange
+    """
     (stype, start, stop) = timerange
     if stype == (None, 'line'):
         return tickerlist[stop:]
@@ -23,14 +90,20 @@ def trim_tickerlist(tickerlist, timerange):
         return tickerlist[0:start]
     elif stype == ('index', 'index'):
         return tickerlist[start:stop]
+    elif 'date' in stype:
+        first = bisect_date(tickerlist, datetime.strptime(start, '%Y%m%d')) if start else 0
+        end = len(tickerlist)
+        if stop:
+            end = bisect_date(tickerlist, datetime.strptime(stop, '%Y%m%d') + timedelta(days=1))
+        return tickerlist[first:end]
 
     return tickerlist
 
 
 def load_tickerdata_file(datadir, pair, ticker_interval, timerange=None):
     """
-    Load a pair from file,
-    :return dict OR empty if unsuccesful
+    Load a pair from file, through the columnar cache of the file (see tickerdata.py)
+    :return TickerColumns OR empty if unsuccesful
     """
     path = make_testdata_path(datadir)
     file = os.path.join(path, '{pair}-{ticker_interval}.json'.format(
@@ -43,12 +116,10 @@ def load_tickerdata_file(datadir, pair, ticker_interval, timerange=None):
     # If file exists, read the file, load the json
     if os.path.isfile(gzipfile):
         logger.debug('Loading ticker data from file %s', gzipfile)
-        with gzip.open(gzipfile) as tickerdata:
-            pairdata = json.load(tickerdata)
+        pairdata = tickerdata.load_ticker_file(gzipfile)
     elif os.path.isfile(file):
         logger.debug('Loading ticker data from file %s', file)
-        with open(file) as tickerdata:
-            pairdata = json.load(tickerdata)
+        pairdata = tickerdata.load_ticker_file(file)
     else:
         return None
 
@@ -57,13 +128,28 @@ def load_tickerdata_file(datadir, pair, ticker_interval, timerange=None):
     return pairdata
 
 
+def load_pair(datadir: str, pair: str, ticker_interval: int, timerange=None):
+    """ Loads a pair from file, downloading it when the file is missing or empty """
+    pairdata = load_tickerdata_file(datadir, pair, ticker_interval, timerange=timerange)
+    if not pairdata:
+        # download the tickerdata from exchange
+        download_backtesting_testdata(datadir, pair=pair, interval=ticker_interval)
+        # and retry reading the pair
+        pairdata = load_tickerdata_file(datadir, pair, ticker_interval, timerange=timerange)
+    return pairdata
+
+
 def load_data(datadir: str, ticker_interval: int, pairs: Optional[List[str]] = None,
-              refresh_pairs: Optional[bool] = False, timerange=None) -> Dict[str, List]:
+              refresh_pairs: Optional[bool] = False, timerange=None,
+              jobs: int = 1) -> Dict[str, Union[tickerdata.TickerColumns, List[Dict]]]:
     """
     Loads ticker history data for the given parameters
     :param ticker_interval: ticker interval in minutes
     :param pairs: list of pairs
-    :return: dict
+    :param jobs: number of threads loading the pairs concurrently, the file reads,
+                 decompression and downloads of several pairs then overlap
+    :return: dict of pair -> TickerColumns, which behave like the list of ticker dicts,
+             in the order of pairs
     """
     result = {}
 
@@ -74,26 +160,72 @@ def load_data(datadir: str, ticker_interval: int, pairs: Optional[List[str]] = N
         logger.info('Download data for all pairs and store them in %s', datadir)
         download_pairs(datadir, _pairs, ticker_interval)
 
+    if jobs > 1 and len(_pairs) > 1:
+        # Threads rather than processes: the memory-mapped columns are not copied
+        with profiler.phase('parallel load_data') as stats:
+            with ThreadPoolExecutor(min(jobs, len(_pairs))) as executor:
+                loaded = executor.map(
+                    lambda pair: load_pair(datadir, pair, ticker_interval, timerange), _pairs)
+                result = dict(zip(_pairs, loaded))
+            stats.candles += sum(len(pairdata or []) for pairdata in result.values())
+        return result
+
     for pair in _pairs:
-        pairdata = load_tickerdata_file(datadir, pair, ticker_interval, timerange=timerange)
-        if not pairdata:
-            # download the tickerdata from exchange
-            download_backtesting_testdata(datadir, pair=pair, interval=ticker_interval)
-            # and retry reading the pair
-            pairdata = load_tickerdata_file(datadir, pair, ticker_interval, timerange=timerange)
+        with profiler.phase('load_data', pair) as stats:
+            pairdata = load_pair(datadir, pair, ticker_interval, timerange)
+            stats.candles += len(pairdata or [])
         result[pair] = pairdata
     return result
 
 
-def tickerdata_to_dataframe(data):
-    preprocessed = preprocess(data)
+def tickerdata_to_dataframe(data, indicators: Optional[Callable] = None, jobs: int = 1,
+                            config: Optional[Dict] = None):
+    preprocessed = preprocess(data, indicators, jobs, config)
     return preprocessed
 
 
-def preprocess(tickerdata: Dict[str, List]) -> Dict[str, DataFrame]:
-    """Creates a dataframe and populates indicators for given ticker data"""
-    return {pair: populate_indicators(parse_ticker_dataframe(pair_data))
-            for pair, pair_data in tickerdata.items()}
+def _init_preprocess_worker(config: Optional[Dict]) -> None:
+    """ Initializes the strategy of a preprocess() worker process """
+    strategy = Strategy()
+    if config is not None and not hasattr(strategy, 'custom_strategy'):
+        # The worker was spawned instead of forked
+        strategy.init(config)
+
+
+def _preprocess_pair_worker(job: Tuple) -> DataFrame:
+    pair_data, indicators = job
+    return indicators(parse_ticker_dataframe(pair_data))
+
+
+def preprocess(tickerdata: Dict[str, List], indicators: Optional[Callable] = None,
+               jobs: int = 1, config: Optional[Dict] = None) -> PreprocessedData:
+    """
+    Creates a dataframe and populates indicators for given ticker data
+    :param indicators: function populating the indicators of a dataframe,
+                       defaults to populate_indicators() of the strategy
+    :param jobs: number of processes populating the indicators of the pairs, TA-Lib only
+                 partially releases the GIL. indicators must then be picklable and the
+                 DataFrames sent back by the workers are copies, not memory-mapped.
+    :param config: config initializing the strategy of spawned worker processes
+    """
+    indicators = indicators or populate_indicators
+    preprocessed = PreprocessedData()
+    if jobs > 1 and len(tickerdata) > 1:
+        with profiler.phase('parallel indicators') as stats:
+            with multiprocessing.Pool(min(jobs, len(tickerdata)),
+                                      initializer=_init_preprocess_worker,
+                                      initargs=(config,)) as pool:
+                frames = pool.map(_preprocess_pair_worker,
+                                  [(pair_data, indicators) for pair_data in tickerdata.values()])
+            preprocessed.update(zip(tickerdata.keys(), frames))
+            stats.candles += sum(len(frame) for frame in frames)
+        return preprocessed
+
+    for pair, pair_data in tickerdata.items():
+        with profiler.phase('indicators', pair) as stats:
+            preprocessed[pair] = indicators(parse_ticker_dataframe(pair_data))
+            stats.candles += len(preprocessed[pair])
+    return preprocessed
 
 
 def make_testdata_path(datadir: str) -> str:
@@ -142,24 +274,88 @@ def download_backtesting_testdata(datadir: str, pair: str, interval: int = 5) ->
         interval=interval,
     ))
 
+    new_data = get_ticker_history(pair=pair, tick_interval=int(interval))
+
+    meta = load_tickerdata_meta(filename)
+    if meta is not None:
+        # Only the candles newer than the stored ones are appended
+        logger.debug("Current End: {}".format(meta['last']))
+        last = meta['last'] or ''
+        rows = {row['T']: row for row in new_data if row['T'] > last}
+        data = [rows[date] for date in sorted(rows)]
+        if data:
+            dump_tickerdata_file(filename, data, meta)
+            logger.debug("New End: {}".format(data[-1]['T']))
+        return True
+
+    # Files without (current) metadata are merged in full once
     if os.path.isfile(filename):
         with open(filename, "rt") as fp:
             data = json.load(fp)
-        logger.debug("Current Start: {}".format(data[1]['T']))
-        logger.debug("Current End: {}".format(data[-1:][0]['T']))
     else:
         data = []
-        logger.debug("Current Start: None")
-        logger.debug("Current End: None")
+    logger.debug("Current Start: {}".format(data[0]['T'] if data else None))
+    logger.debug("Current End: {}".format(data[-1]['T'] if data else None))
 
-    new_data = get_ticker_history(pair=pair, tick_interval=int(interval))
-    for row in new_data:
-        if row not in data:
-            data.append(row)
-    logger.debug("New Start: {}".format(data[1]['T']))
-    logger.debug("New End: {}".format(data[-1:][0]['T']))
-    data = sorted(data, key=lambda data: data['T'])
+    # Candles are keyed by date, the stored ones are kept
+    rows = {row['T']: row for row in new_data}
+    rows.update((row['T'], row) for row in data)
+    data = [rows[date] for date in sorted(rows)]
+    logger.debug("New Start: {}".format(data[0]['T'] if data else None))
+    logger.debug("New End: {}".format(data[-1]['T'] if data else None))
 
-    misc.file_dump_json(filename, data)
+    dump_tickerdata_file(filename, data)
 
     return True
+
+
+def load_tickerdata_meta(filename: str) -> Optional[Dict]:
+    """
+    :return: metadata of a ticker data file written by dump_tickerdata_file(): the date of
+             its last candle and its candle count, None if the file changed since then
+    """
+    try:
+        with open(filename + '.meta') as fp:
+            meta = json.load(fp)
+        if meta['source'] != tickerdata.source_stat(filename):
+            return None
+        return meta
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _copy_appending(filename: str, copy_filename: str, data: List[Dict]) -> None:
+    """ Copies the json list of filename with data added at its end, without parsing it """
+    with open(filename, 'rb') as source, open(copy_filename, 'wb') as copy:
+        shutil.copyfileobj(source, copy)
+        # Replace the closing bracket of the list
+        tail_start = max(0, source.tell() - 64)
+        source.seek(tail_start)
+        tail = source.read()
+        bracket = tail.rindex(b']')
+        separator = b'' if tail[:bracket].rstrip().endswith(b'[') else b', '
+        copy.seek(tail_start + bracket)
+        copy.truncate()
+        copy.write(separator + json.dumps(data)[1:-1].encode() + b']')
+
+
+def dump_tickerdata_file(filename: str, data: List[Dict], meta: Optional[Dict] = None) -> None:
+    """
+    Writes a ticker data file and its metadata, each through a temporary file and a rename
+    :param data: candles sorted by date
+    :param meta: metadata of the current file, data are then the candles appended to it
+    """
+    tmp_filename = filename + '.tmp'
+    if meta is None:
+        misc.file_dump_json(tmp_filename, data)
+        count = len(data)
+    else:
+        _copy_appending(filename, tmp_filename, data)
+        count = meta['count'] + len(data)
+    os.replace(tmp_filename, filename)
+
+    meta = {'source': tickerdata.source_stat(filename),
+            'last': data[-1]['T'] if data else None,
+            'count': count}
+    misc.file_dump_json(filename + '.meta.tmp', meta)
+    os.replace(filename + '.meta.tmp', filename + '.meta')
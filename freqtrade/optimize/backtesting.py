@@ -1,98 +1,603 @@
 # pragma pylint: disable=missing-docstring,W0212
 
+import heapq
 import logging
-from typing import Dict, Tuple
+import multiprocessing
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
 
 import arrow
-from pandas import DataFrame, Series
+import numpy as np
+from pandas import DataFrame, Timestamp
 from tabulate import tabulate
 
 import freqtrade.misc as misc
 import freqtrade.optimize as optimize
-from freqtrade import exchange
+from freqtrade.optimize import profiler
+from freqtrade import exchange, main
 from freqtrade.analyze import populate_buy_trend, populate_sell_trend
 from freqtrade.exchange import Bittrex
 from freqtrade.main import should_sell
-from freqtrade.persistence import Trade
-from freqtrade.strategy.strategy import Strategy
+from freqtrade.persistence import ITrade
+from freqtrade.strategy.strategy import Strategy, StrategyParameters
 
 logger = logging.getLogger(__name__)
 
+EXPORT_FILENAME = 'backtest-result.jsonl'
+
+# Columns of the DataFrame returned by backtest()
+RESULT_COLUMNS = ['currency', 'profit_percent', 'profit_BTC', 'duration']
+
+# Float profits are compared against the thresholds with this tolerance, so that
+# the candidate rows are a superset of the rows selected by the SimTrade math
+PROFIT_TOLERANCE = 1e-6
+
+# Number of rows after the buy row checked at once by the vectorized exit search,
+# doubled each time no exit is found
+EXIT_WINDOW = 64
+
+
+class SimTrade(ITrade):
+    """
+    Lightweight trade used by backtesting instead of the SQLAlchemy Trade model.
+    Profits are computed with floats instead of Decimals and rounded like Trade does.
+    """
+    __slots__ = ('open_rate', 'open_date', 'stake_amount', 'amount', 'fee', 'close_rate',
+                 '_open_trade_price')
+
+    def __init__(self, open_rate: float, open_date: datetime, stake_amount: float,
+                 amount: float, fee: float, close_rate: Optional[float] = None) -> None:
+        self.open_rate = open_rate
+        self.open_date = open_date
+        self.stake_amount = stake_amount
+        self.amount = amount
+        self.fee = fee
+        self.close_rate = close_rate
+        self._open_trade_price = amount * open_rate * (1 + fee)
+
+    def __repr__(self):
+        return 'SimTrade(amount={:.8f}, open_rate={:.8f}, open_date={})'.format(
+            self.amount, self.open_rate, self.open_date)
+
+    def calc_open_trade_price(self, fee: Optional[float] = None) -> float:
+        """
+        Calculate the open_rate in BTC
+        :return: Price in BTC of the open trade
+        """
+        if fee is None:
+            return self._open_trade_price
+        return self.amount * self.open_rate * (1 + fee)
+
+    def calc_close_trade_price(
+            self, rate: Optional[float] = None, fee: Optional[float] = None) -> float:
+        """
+        Calculate the close_rate in BTC
+        If rate is not set self.close_rate will be used
+        :return: Price in BTC of the closed trade
+        """
+        if rate is None and not self.close_rate:
+            return 0.0
+        return self.amount * (rate or self.close_rate) * (1 - (fee or self.fee))
+
+    def calc_profit(self, rate: Optional[float] = None, fee: Optional[float] = None) -> float:
+        """
+        Calculate the profit in BTC between Close and Open trade
+        :return: profit in BTC as float
+        """
+        return round(self.calc_close_trade_price(rate, fee) - self.calc_open_trade_price(), 8)
+
+    def calc_profit_percent(
+            self, rate: Optional[float] = None, fee: Optional[float] = None) -> float:
+        """
+        Calculates the profit in percentage (including fee).
+        :return: profit in percentage as float
+        """
+        return round(self.calc_close_trade_price(rate, fee) / self.calc_open_trade_price() - 1, 8)
+
 
 def get_timeframe(data: Dict[str, DataFrame]) -> Tuple[arrow.Arrow, arrow.Arrow]:
     """
     Get the maximum timeframe for the given backtest data
+    The result is cached on optimize.PreprocessedData containers
     :param data: dictionary with preprocessed backtesting data
     :return: tuple containing min_date, max_date
     """
-    all_dates = Series([])
-    for pair_data in data.values():
-        all_dates = all_dates.append(pair_data['date'])
-    all_dates.sort_values(inplace=True)
-    return arrow.get(all_dates.iloc[0]), arrow.get(all_dates.iloc[-1])
+    timeframe = getattr(data, 'timeframe', None)
+    if timeframe is None:
+        timeframe = (min(pair_data['date'].min() for pair_data in data.values()),
+                     max(pair_data['date'].max() for pair_data in data.values()))
+        if isinstance(data, optimize.PreprocessedData):
+            data.timeframe = timeframe
+    return arrow.get(timeframe[0]), arrow.get(timeframe[1])
 
 
 def generate_text_table(
         data: Dict[str, Dict], results: DataFrame, stake_currency) -> str:
     """
     Generates and returns a text table for the given backtest data and the results dataframe
+    The per pair values are aggregated in one groupby over the results
     :return: pretty printed table with tabulate as str
     """
-    floatfmt = ('s', 'd', '.2f', '.8f', '.1f')
+    floatfmt = ('s', 'd', '.2f', '.8f', '.1f', 'd', 'd', '.1f', '.1f')
     tabular_data = []
     headers = ['pair', 'buy count', 'avg profit %',
-               'total profit ' + stake_currency, 'avg duration', 'profit', 'loss']
+               'total profit ' + stake_currency, 'avg duration', 'profit', 'loss',
+               'win rate %', 'median duration']
+    results = results.assign(profit=(results.profit_BTC > 0).astype(int),
+                             loss=(results.profit_BTC < 0).astype(int))
+
+    def table_row(pair, count, profit_percent, profit_btc, duration, profit, loss,
+                  median_duration) -> List:
+        win_rate = profit / count * 100.0 if count else float('nan')
+        return [pair, count, profit_percent * 100.0, profit_btc, duration, profit, loss,
+                win_rate, median_duration]
+
+    grouped = results.groupby('currency')
+    per_pair = DataFrame({
+        'count': grouped.size(),
+        'profit_percent': grouped.profit_percent.mean(),
+        'profit_BTC': grouped.profit_BTC.sum(),
+        'duration': grouped.duration.mean(),
+        'profit': grouped.profit.sum(),
+        'loss': grouped.loss.sum(),
+        'median_duration': grouped.duration.median(),
+    }, columns=['count', 'profit_percent', 'profit_BTC', 'duration', 'profit', 'loss',
+                'median_duration'])
+    rows = {row[0]: table_row(*row) for row in per_pair.itertuples()}
     for pair in data:
-        result = results[results.currency == pair]
-        tabular_data.append([
-            pair,
-            len(result.index),
-            result.profit_percent.mean() * 100.0,
-            result.profit_BTC.sum(),
-            result.duration.mean(),
-            len(result[result.profit_BTC > 0]),
-            len(result[result.profit_BTC < 0])
-        ])
+        tabular_data.append(rows.get(pair) or table_row(
+            pair, 0, float('nan'), 0.0, float('nan'), 0, 0, float('nan')))
 
     # Append Total
-    tabular_data.append([
+    tabular_data.append(table_row(
         'TOTAL',
         len(results.index),
-        results.profit_percent.mean() * 100.0,
+        results.profit_percent.mean(),
         results.profit_BTC.sum(),
         results.duration.mean(),
-        len(results[results.profit_BTC > 0]),
-        len(results[results.profit_BTC < 0])
-    ])
+        results.profit.sum(),
+        results.loss.sum(),
+        results.duration.median()
+    ))
     return tabulate(tabular_data, headers=headers, floatfmt=floatfmt)
 
 
-def get_sell_trade_entry(pair, buy_row, partial_ticker, trade_count_lock, args):
-    stake_amount = args['stake_amount']
+def get_columns(ticker_data: DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Extracts the columns used by the trade simulation as numpy arrays,
+    dates are converted to int64 nanoseconds since epoch (UTC)
+    :param ticker_data: DataFrame with date, open, close, buy and sell columns
+    :return: dict of column name -> array
+    """
+    return {
+        'date': ticker_data['date'].values.astype(np.int64),
+        # Without copy the prices stay views of the memory-mapped ticker data
+        'open': ticker_data['open'].values.astype(np.float64, copy=False),
+        'close': ticker_data['close'].values.astype(np.float64, copy=False),
+        'buy': ticker_data['buy'].values,
+        'sell': ticker_data['sell'].values,
+    }
+
+
+def get_date(columns: Dict[str, np.ndarray], index: int) -> Timestamp:
+    """ Returns the date of the given row as UTC Timestamp """
+    return Timestamp(columns['date'][index], tz='UTC')
+
+
+def create_trade(columns: Dict[str, np.ndarray], index: int, stake_amount: float) -> SimTrade:
+    """ Creates the trade bought at the given row """
+    return SimTrade(open_rate=columns['close'][index],
+                    open_date=get_date(columns, index),
+                    stake_amount=stake_amount,
+                    amount=stake_amount / columns['open'][index],
+                    fee=exchange.get_fee()
+                    )
+
+
+def check_sell(trade: SimTrade, pair: str, sell_index: int,
+               columns: Dict[str, np.ndarray], args: Dict) -> Optional[Tuple]:
+    """
+    Evaluates should_sell() on the given row
+    :param args: backtest() arguments, with the strategy and experimental settings
+    :return: trade entry tuple (pair, profit_percent, profit_BTC, duration) if sold, else None
+    """
+    sell_date = get_date(columns, sell_index)
+    close = columns['close'][sell_index]
+    if should_sell(trade, close, sell_date, columns['buy'][sell_index],
+                   columns['sell'][sell_index], args['strategy'], args['experimental']):
+        return (pair,
+                trade.calc_profit_percent(rate=close),
+                trade.calc_profit(rate=close),
+                (sell_date - trade.open_date).seconds // 60
+                )
+    return None
+
+
+def lock_trade_count(trade_count_lock: Dict[int, int], columns: Dict[str, np.ndarray],
+                     start: int, stop: int) -> None:
+    """ Increase trade_count_lock for every row in [start, stop) """
+    for date in columns['date'][start:stop].tolist():
+        trade_count_lock[date] = trade_count_lock.get(date, 0) + 1
+
+
+def get_sell_trade_entry(pair, index, columns, trade_count_lock, args, roi_table=None):
+    """
+    Reference implementation: evaluates should_sell() on every row after the buy row
+    :return: tuple of sell index and trade entry, None if the trade is never sold
+    """
+    trade = create_trade(columns, index, args['stake_amount'])
     max_open_trades = args.get('max_open_trades', 0)
-    trade = Trade(open_rate=buy_row.close,
-                  open_date=buy_row.date,
-                  stake_amount=stake_amount,
-                  amount=stake_amount / buy_row.open,
-                  fee=exchange.get_fee()
-                  )
 
     # calculate win/lose forwards from buy point
-    for sell_row in partial_ticker:
+    for sell_index in range(index + 1, len(columns['date'])):
         if max_open_trades > 0:
             # Increase trade_count_lock for every iteration
-            trade_count_lock[sell_row.date] = trade_count_lock.get(sell_row.date, 0) + 1
-
-        buy_signal = sell_row.buy
-        if should_sell(trade, sell_row.close, sell_row.date, buy_signal, sell_row.sell):
-            return sell_row, (pair,
-                              trade.calc_profit_percent(rate=sell_row.close),
-                              trade.calc_profit(rate=sell_row.close),
-                              (sell_row.date - buy_row.date).seconds // 60
-                              ), sell_row.date
+            lock_trade_count(trade_count_lock, columns, sell_index, sell_index + 1)
+
+        trade_entry = check_sell(trade, pair, sell_index, columns, args)
+        if trade_entry:
+            return sell_index, trade_entry
     return None
 
 
+def stack_exit_parameters(strategies: List[StrategyParameters]
+                          ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Stacks the stoplosses and ROI lookup tables of several strategies into arrays
+    :return: tuple containing the stoplosses (-inf for none), the bounds and thresholds
+             of the ROI tables, one row per strategy, padded with inf
+    """
+    size = max(len(strategy.roi_table[0]) for strategy in strategies)
+    stoplosses = np.array([-np.inf if strategy.stoploss is None else strategy.stoploss
+                           for strategy in strategies], dtype=np.float64)
+    bounds = np.full((len(strategies), size), np.inf)
+    thresholds = np.full((len(strategies), size + 1), np.inf)
+    for number, strategy in enumerate(strategies):
+        strategy_bounds, strategy_thresholds = strategy.roi_table
+        bounds[number, :len(strategy_bounds)] = strategy_bounds
+        thresholds[number, :len(strategy_thresholds)] = strategy_thresholds
+    return stoplosses, bounds, thresholds
+
+
+def get_sell_candidates_batch(index: int, start: int, stop: int, columns: Dict[str, np.ndarray],
+                              fee: float, exit_parameters: Tuple[np.ndarray, np.ndarray,
+                                                                 np.ndarray],
+                              experimental: Dict) -> np.ndarray:
+    """
+    Computes the profit curve of a trade bought at row `index` for the rows [start, stop)
+    at once and compares it with the thresholds of several strategies.
+    The profits are compared with PROFIT_TOLERANCE, so the result is a superset
+    of the exact sell rows: the first candidate confirmed by should_sell() is the exit.
+    :param index: index of the buy row
+    :param columns: dict with the date (int64 ns), close, buy and sell columns as arrays
+    :param exit_parameters: stoplosses and ROI tables, see stack_exit_parameters()
+    :return: bool array of the rows where should_sell() may return True,
+             one line per strategy
+    """
+    window = slice(start, stop)
+    open_rate = columns['close'][index]
+    # amount cancels out of calc_profit_percent()
+    profit = (columns['close'][window] * (1 - fee)) / (open_rate * (1 + fee)) - 1
+
+    stoplosses, bounds, thresholds = exit_parameters
+    candidates = profit < stoplosses[:, None] + PROFIT_TOLERANCE
+
+    minutes = (columns['date'][window] - columns['date'][index]) / 60e9
+    # bounds.searchsorted(minutes) of every strategy
+    positions = (bounds[:, :, None] < minutes).sum(axis=1)
+    roi = thresholds[np.arange(len(thresholds))[:, None], positions]
+    candidates |= profit > roi - PROFIT_TOLERANCE
+
+    if experimental.get('use_sell_signal', False):
+        sell_signal = (columns['sell'][window] != 0) & (columns['buy'][window] == 0)
+        if experimental.get('sell_profit_only', False):
+            sell_signal &= profit > -PROFIT_TOLERANCE
+        candidates |= sell_signal
+
+    return candidates
+
+
+def get_sell_candidates(index: int, start: int, stop: int, columns: Dict[str, np.ndarray],
+                        fee: float, stoploss: float, roi_table: Tuple[np.ndarray, np.ndarray],
+                        experimental: Dict) -> np.ndarray:
+    """
+    get_sell_candidates_batch() of a single stoploss and ROI table
+    :return: sorted array of the indexes of the rows where should_sell() may return True
+    """
+    bounds, thresholds = roi_table
+    exit_parameters = (np.array([-np.inf if stoploss is None else stoploss]),
+                       bounds[None, :], thresholds[None, :])
+    candidates = get_sell_candidates_batch(index, start, stop, columns, fee,
+                                           exit_parameters, experimental)
+    return np.flatnonzero(candidates[0]) + start
+
+
+def get_sell_trade_entry_vectorized(pair, index, columns, trade_count_lock, args, roi_table):
+    """
+    Same as get_sell_trade_entry() but only evaluates should_sell() on the rows
+    returned by get_sell_candidates(). The forward window grows geometrically,
+    so the work per trade is proportional to its duration.
+    """
+    trade = create_trade(columns, index, args['stake_amount'])
+    max_open_trades = args.get('max_open_trades', 0)
+    stoploss = args['strategy'].stoploss
+    experimental = args['experimental']
+    length = len(columns['date'])
+
+    result = None
+    start, size = index + 1, EXIT_WINDOW
+    while result is None and start < length:
+        stop = min(start + size, length)
+        for sell_index in get_sell_candidates(index, start, stop, columns, trade.fee,
+                                              stoploss, roi_table, experimental):
+            trade_entry = check_sell(trade, pair, sell_index, columns, args)
+            if trade_entry:
+                result = sell_index, trade_entry
+                stop = sell_index + 1
+                break
+        if max_open_trades > 0:
+            # Increase trade_count_lock for every row the trade was open
+            lock_trade_count(trade_count_lock, columns, start, stop)
+        start, size = stop, size * 2
+    return result
+
+
+def get_sell_trade_entries(pair: str, index: int, columns: Dict[str, np.ndarray],
+                           candidate_args: List[Dict],
+                           exit_parameters: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                           numbers: np.ndarray) -> Dict[int, Tuple]:
+    """
+    Same as get_sell_trade_entry_vectorized() for several strategies at once: the profit
+    curve of the trade is computed once per window for all of them
+    :param candidate_args: backtest() arguments of every strategy
+    :param exit_parameters: stoplosses and ROI tables, see stack_exit_parameters()
+    :param numbers: strategies to find the exit of
+    :return: dict of strategy number -> (sell index, trade entry) of the sold trades
+    """
+    trade = create_trade(columns, index, candidate_args[0]['stake_amount'])
+    experimental = candidate_args[0]['experimental']
+    length = len(columns['date'])
+
+    exits: Dict[int, Tuple] = {}
+    start, size = index + 1, EXIT_WINDOW
+    while len(numbers) and start < length:
+        stop = min(start + size, length)
+        candidates = get_sell_candidates_batch(
+            index, start, stop, columns, trade.fee,
+            tuple(parameter[numbers] for parameter in exit_parameters), experimental)
+        for number, rows in zip(numbers.tolist(), candidates):
+            for sell_index in np.flatnonzero(rows) + start:
+                trade_entry = check_sell(trade, pair, sell_index, columns, candidate_args[number])
+                if trade_entry:
+                    exits[number] = sell_index, trade_entry
+                    break
+        numbers = np.array([number for number in numbers.tolist() if number not in exits],
+                           dtype=np.int64)
+        start, size = stop, size * 2
+    return exits
+
+
+def get_pair_columns(pair_data: DataFrame, pair: Optional[str] = None,
+                     buy_trend: Optional[Callable] = None,
+                     sell_trend: Optional[Callable] = None) -> Dict[str, np.ndarray]:
+    """
+    Populates the buy and sell signals of a pair and returns its simulation columns
+    :param pair: pair name the signal phases are profiled under
+    :param buy_trend: function populating the buy column, defaults to populate_buy_trend()
+    :param sell_trend: function populating the sell column, defaults to populate_sell_trend()
+    """
+    headers = ['date', 'buy', 'open', 'close', 'sell']
+    pair_data['buy'], pair_data['sell'] = 0, 0  # cleanup from previous run
+    with profiler.phase('buy signals', pair) as stats:
+        pair_data = (buy_trend or populate_buy_trend)(pair_data)
+        stats.candles += len(pair_data)
+        stats.signals += int((pair_data['buy'] == 1).sum())
+    with profiler.phase('sell signals', pair) as stats:
+        pair_data = (sell_trend or populate_sell_trend)(pair_data)
+        stats.candles += len(pair_data)
+        stats.signals += int((pair_data['sell'] == 1).sum())
+    return get_columns(pair_data[headers])
+
+
+def get_buy_indexes(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Returns the rows with a buy signal that would not immediately sell off.
+    They are cached in the columns, which can be simulated again with other exits.
+    """
+    if 'buy_indexes' not in columns:
+        columns['buy_indexes'] = np.flatnonzero(~((columns['buy'] == 0) |
+                                                  (columns['sell'] == 1)))
+    return columns['buy_indexes']
+
+
+def backtest_pair(pair: str, columns: Dict[str, np.ndarray], args: Dict,
+                  roi_table: Tuple[np.ndarray, np.ndarray], trade_count_lock: Dict[int, int],
+                  exits: Dict[int, Optional[Tuple]]) -> List[Tuple]:
+    """
+    Simulates the trades of one pair
+    :param trade_count_lock: number of open trades per date (int64 ns), shared between pairs
+    :param exits: exits of already simulated buy rows, buy index -> result of the
+                  sell trade entry function. Filled with the newly simulated buy rows.
+    :return: list of tuples (buy index, sell index, trade entry)
+    """
+    max_open_trades = args.get('max_open_trades', 0)
+    realistic = args.get('realistic', False)
+    if args.get('vectorized', True):
+        sell_trade_entry = get_sell_trade_entry_vectorized
+    else:
+        sell_trade_entry = get_sell_trade_entry
+    dates = columns['date']
+    trades = []
+
+    lock_pair_until = None
+    for index in get_buy_indexes(columns).tolist():
+        if realistic:
+            if lock_pair_until is not None and dates[index] <= lock_pair_until:
+                continue
+        if max_open_trades > 0:
+            # Check if max_open_trades has already been reached for the given date
+            date = int(dates[index])
+            if not trade_count_lock.get(date, 0) < max_open_trades:
+                continue
+            trade_count_lock[date] = trade_count_lock.get(date, 0) + 1
+
+        if index in exits:
+            ret = exits[index]
+            if max_open_trades > 0:
+                stop = ret[0] + 1 if ret else len(dates)
+                lock_trade_count(trade_count_lock, columns, index + 1, stop)
+        else:
+            ret = sell_trade_entry(pair, index, columns, trade_count_lock, args, roi_table)
+            exits[index] = ret
+        if ret:
+            sell_index, trade_entry = ret
+            lock_pair_until = dates[sell_index]
+            trades.append((index, sell_index, trade_entry))
+    return trades
+
+
+def backtest_timeline(simulated: Dict[str, Tuple], args: Dict,
+                      roi_table: Tuple[np.ndarray, np.ndarray]) -> List[Tuple]:
+    """
+    Simulates all pairs on one candle timeline: the buy rows of all pairs are processed
+    in time order, so the max_open_trades slots go to the earliest buy signals instead of
+    the first pairs of the whitelist. The open trades are kept in a heap of the timeline
+    steps they are sold at.
+    :param simulated: dict of pair -> (columns, exits), see backtest_pair()
+    :return: list of tuples (pair, buy index, sell index, trade entry) in buy time order
+    """
+    max_open_trades = args.get('max_open_trades', 0)
+    realistic = args.get('realistic', False)
+    if args.get('vectorized', True):
+        sell_trade_entry = get_sell_trade_entry_vectorized
+    else:
+        sell_trade_entry = get_sell_trade_entry
+    # exits are computed without slots, those are tracked by the heap
+    exit_args = {**args, 'max_open_trades': 0}
+
+    pairs = list(simulated.keys())
+    timeline = np.unique(np.concatenate([columns['date'] for columns, _ in simulated.values()]))
+    # timeline step of every row, per pair
+    pair_steps = [np.searchsorted(timeline, columns['date']) for columns, _ in simulated.values()]
+
+    # buy rows of all pairs, ordered by timeline step then whitelist order
+    buy_indexes = [get_buy_indexes(columns) for columns, _ in simulated.values()]
+    indexes = np.concatenate(buy_indexes)
+    numbers = np.concatenate([np.full(len(rows), number, dtype=np.int64)
+                              for number, rows in enumerate(buy_indexes)])
+    steps = np.concatenate([pair_steps[number][rows] for number, rows in enumerate(buy_indexes)])
+    order = np.lexsort((numbers, steps))
+
+    trades = []
+    open_trades: List[int] = []
+    lock_pair_until = [-1] * len(pairs)
+    for index, number, step in zip(indexes[order].tolist(), numbers[order].tolist(),
+                                   steps[order].tolist()):
+        if realistic and step <= lock_pair_until[number]:
+            continue
+        if max_open_trades > 0:
+            # trades sold before this step have freed their slot
+            while open_trades and open_trades[0] < step:
+                heapq.heappop(open_trades)
+            if len(open_trades) >= max_open_trades:
+                continue
+
+        pair = pairs[number]
+        columns, exits = simulated[pair]
+        if index in exits:
+            ret = exits[index]
+        else:
+            ret = sell_trade_entry(pair, index, columns, {}, exit_args, roi_table)
+            exits[index] = ret
+        sell_step = len(timeline)
+        if ret:
+            sell_index, trade_entry = ret
+            sell_step = int(pair_steps[number][sell_index])
+            lock_pair_until[number] = sell_step
+            trades.append((pair, index, sell_index, trade_entry))
+        if max_open_trades > 0:
+            heapq.heappush(open_trades, sell_step)
+    return trades
+
+
+def _init_backtest_worker(config: Dict) -> None:
+    """ Initializes the global state of a backtest_pairs_parallel() worker process """
+    exchange._API = Bittrex({'key': '', 'secret': ''})
+    main._CONF = config
+    strategy = Strategy()
+    if not hasattr(strategy, 'custom_strategy'):
+        # The worker was spawned instead of forked
+        strategy.init(config)
+
+
+def _backtest_pair_worker(job: Tuple[str, DataFrame, Dict]) -> Tuple:
+    pair, pair_data, args = job
+    columns = get_pair_columns(pair_data, None, args['populate_buy_trend'],
+                               args['populate_sell_trend'])
+    exits: Dict[int, Optional[Tuple]] = {}
+    # Simulate without max_open_trades, the slots are allocated when merging
+    backtest_pair(pair, columns, {**args, 'max_open_trades': 0},
+                  args['strategy'].roi_table, {}, exits)
+    return columns, exits
+
+
+def backtest_pairs_parallel(args: Dict, jobs: int) -> Dict[str, Tuple]:
+    """
+    Populates the signals and simulates every pair on its own in a process pool.
+    The signal functions are sent to the workers, so they must be picklable.
+    :return: dict of pair -> (columns, exits) usable by backtest_pair()
+    """
+    processed = args['processed']
+    worker_args = {key: value for key, value in args.items() if key != 'processed'}
+    with multiprocessing.Pool(min(jobs, len(processed)), initializer=_init_backtest_worker,
+                              initargs=(main._CONF,)) as pool:
+        results = pool.map(_backtest_pair_worker,
+                           [(pair, pair_data, worker_args)
+                            for pair, pair_data in processed.items()])
+    return dict(zip(processed.keys(), results))
+
+
+def _iter_pair_trades(simulated: Dict[str, Tuple], args: Dict,
+                      roi_table: Tuple[np.ndarray, np.ndarray]):
+    """
+    Simulates the pairs one after another, allocating the open trade slots
+    in whitelist order, and yields the trades as each pair is simulated
+    :return: generator of (pair, index, sell_index, trade_entry)
+    """
+    # number of open trades per date (int64 ns)
+    trade_count_lock: Dict[int, int] = {}
+    for pair, (columns, exits) in simulated.items():
+        with profiler.phase('simulation', pair) as stats:
+            pair_trades = backtest_pair(pair, columns, args, roi_table, trade_count_lock, exits)
+            stats.candles += len(columns['date'])
+        for index, sell_index, trade_entry in pair_trades:
+            yield pair, index, sell_index, trade_entry
+
+
+def get_trade_record(pair: str, index: int, sell_index: int,
+                     columns: Dict[str, np.ndarray], trade_entry: Tuple) -> List:
+    """
+    Builds the exported record of a trade, one line of backtest-result.jsonl
+    :return: json.dump friendly list of pair, profit_percent,
+             buy date and sell date (seconds since epoch), buy index, duration
+    """
+    return [pair, trade_entry[1],
+            int(columns['date'][index]) // 10 ** 9,
+            int(columns['date'][sell_index]) // 10 ** 9,
+            int(index), trade_entry[3]]
+
+
+def get_backtest_args(args: Dict) -> Dict:
+    """ :return: copy of the backtest() arguments with the defaults of the optional ones """
+    return {
+        **args,
+        'strategy': args.get('strategy') or StrategyParameters.from_strategy(),
+        'experimental': args.get('experimental', main._CONF.get('experimental', {})),
+        'populate_buy_trend': args.get('populate_buy_trend') or populate_buy_trend,
+        'populate_sell_trend': args.get('populate_sell_trend') or populate_sell_trend,
+    }
+
+
 def backtest(args) -> DataFrame:
     """
     Implements backtesting functionality
@@ -103,57 +608,109 @@ def backtest(args) -> DataFrame:
         realistic: do we try to simulate realistic trades? (default: True)
         sell_profit_only: sell if profit only
         use_sell_signal: act on sell-signal
+        vectorized: find exits with get_sell_candidates() (default: True),
+                    False runs the reference loop over every row
+        jobs: number of processes simulating the pairs (default: 1).
+              The open trade slots are then allocated in whitelist order,
+              giving the same results as the serial run.
+        timeline: allocate the open trade slots in time order over all pairs
+                  (default: False, allocate them in whitelist order)
+        record: 'trades' streams every trade to backtest-result.jsonl,
+                one record per line, see get_trade_record()
+        strategy: StrategyParameters with the stoploss and ROI table
+                  (default: the ones of the Strategy)
+        experimental: experimental settings (default: the ones of the config)
+        populate_buy_trend: function populating the buy signals of a pair
+                            (default: the one of the Strategy)
+        populate_sell_trend: function populating the sell signals of a pair
+                             (default: the one of the Strategy)
+        columns: dict of pair -> columns from get_pair_columns(), signals computed
+                 beforehand to simulate them again with other exits. The signal
+                 functions and jobs are then ignored.
     :return: DataFrame
     """
-    headers = ['date', 'buy', 'open', 'close', 'sell']
     processed = args['processed']
-    max_open_trades = args.get('max_open_trades', 0)
-    realistic = args.get('realistic', False)
     record = args.get('record', None)
-    records = []
+    jobs = args.get('jobs', 1)
     trades = []
-    trade_count_lock: dict = {}
     exchange._API = Bittrex({'key': '', 'secret': ''})
-    for pair, pair_data in processed.items():
-        pair_data['buy'], pair_data['sell'] = 0, 0  # cleanup from previous run
-
-        ticker_data = populate_sell_trend(populate_buy_trend(pair_data))[headers]
-        ticker = [x for x in ticker_data.itertuples()]
+    args = get_backtest_args(args)
+    roi_table = args['strategy'].roi_table
+    if args.get('columns') is not None:
+        simulated = {pair: (args['columns'][pair], {}) for pair in processed}
+    elif jobs > 1:
+        with profiler.phase('parallel simulation'):
+            simulated = backtest_pairs_parallel(args, jobs)
+    else:
+        simulated = {pair: (get_pair_columns(pair_data, pair, args['populate_buy_trend'],
+                                             args['populate_sell_trend']), {})
+                     for pair, pair_data in processed.items()}
 
-        lock_pair_until = None
-        for index, row in enumerate(ticker):
-            if row.buy == 0 or row.sell == 1:
-                continue  # skip rows where no buy signal or that would immediately sell off
+    if args.get('timeline', False):
+        with profiler.phase('simulation') as stats:
+            pair_trades = backtest_timeline(simulated, args, roi_table)
+            stats.candles += sum(len(columns['date']) for columns, _ in simulated.values())
+    else:
+        pair_trades = _iter_pair_trades(simulated, args, roi_table)
 
-            if realistic:
-                if lock_pair_until is not None and row.date <= lock_pair_until:
-                    continue
-            if max_open_trades > 0:
-                # Check if max_open_trades has already been reached for the given date
-                if not trade_count_lock.get(row.date, 0) < max_open_trades:
-                    continue
-                trade_count_lock[row.date] = trade_count_lock.get(row.date, 0) + 1
-
-            ret = get_sell_trade_entry(pair, row, ticker[index+1:], trade_count_lock, args)
-            if ret:
-                row2, trade_entry, next_date = ret
-                lock_pair_until = next_date
-                trades.append(trade_entry)
-                if record:
-                    # Note, need to be json.dump friendly
-                    # record a tuple of pair, current_profit_percent,
-                    # entry-date, duration
-                    records.append((pair, trade_entry[1],
-                                    row.date.strftime('%s'),
-                                    row2.date.strftime('%s'),
-                                    row.date, trade_entry[3]))
-    # For now export inside backtest(), maybe change so that backtest()
-    # returns a tuple like: (dataframe, records, logs, etc)
+    writer = None
     if record and record.find('trades') >= 0:
-        logger.info('Dumping backtest results')
-        misc.file_dump_json('backtest-result.json', records)
-    labels = ['currency', 'profit_percent', 'profit_BTC', 'duration']
-    return DataFrame.from_records(trades, columns=labels)
+        logger.info('Dumping backtest results to %s', EXPORT_FILENAME)
+        writer = misc.JsonLinesWriter(EXPORT_FILENAME)
+    try:
+        for pair, index, sell_index, trade_entry in pair_trades:
+            trades.append(trade_entry)
+            if writer:
+                writer.write(get_trade_record(pair, index, sell_index,
+                                              simulated[pair][0], trade_entry))
+    finally:
+        if writer:
+            writer.close()
+    return DataFrame.from_records(trades, columns=RESULT_COLUMNS)
+
+
+def backtest_candidates(args: Dict, strategies: List[StrategyParameters]) -> List[DataFrame]:
+    """
+    Backtests several stoplosses and ROI tables on the same buy and sell signals in one
+    pass: the exits of a buy row are searched for all the strategies at once, see
+    get_sell_trade_entries(). Each result equals the one of backtest() with the strategy.
+    :param args: backtest() arguments, without max_open_trades, timeline and record.
+                 The strategy is taken from strategies.
+    :param strategies: stoploss and ROI table of every candidate
+    :return: list of DataFrame, one per strategy
+    """
+    if args.get('max_open_trades', 0) > 0:
+        raise ValueError('max_open_trades is not supported by backtest_candidates()')
+    processed = args['processed']
+    realistic = args.get('realistic', False)
+    exchange._API = Bittrex({'key': '', 'secret': ''})
+    args = get_backtest_args(args)
+    columns = args.get('columns')
+    if columns is None:
+        columns = {pair: get_pair_columns(pair_data, pair, args['populate_buy_trend'],
+                                          args['populate_sell_trend'])
+                   for pair, pair_data in processed.items()}
+    candidate_args = [{**args, 'strategy': strategy} for strategy in strategies]
+    exit_parameters = stack_exit_parameters(strategies)
+
+    trades: List[List[Tuple]] = [[] for _ in strategies]
+    for pair in processed:
+        pair_columns = columns[pair]
+        dates = pair_columns['date']
+        lock_pair_until = np.full(len(strategies), np.iinfo(np.int64).min, dtype=np.int64)
+        numbers = np.arange(len(strategies))
+        with profiler.phase('simulation', pair) as stats:
+            for index in get_buy_indexes(pair_columns).tolist():
+                if realistic:
+                    numbers = np.flatnonzero(lock_pair_until < dates[index])
+                exits = get_sell_trade_entries(pair, index, pair_columns, candidate_args,
+                                               exit_parameters, numbers)
+                for number, (sell_index, trade_entry) in exits.items():
+                    lock_pair_until[number] = dates[sell_index]
+                    trades[number].append(trade_entry)
+            stats.candles += len(dates)
+    return [DataFrame.from_records(strategy_trades, columns=RESULT_COLUMNS)
+            for strategy_trades in trades]
 
 
 def start(args):
@@ -180,6 +737,8 @@ def start(args):
 
     logger.info('Using ticker_interval: %d ...', strategy.ticker_interval)
 
+    profile = profiler.enable() if args.profile is not None else None
+
     data = {}
     pairs = config['exchange']['pair_whitelist']
     logger.info('Using stake_currency: %s ...', config['stake_currency'])
@@ -197,17 +756,17 @@ def start(args):
                                   pairs=pairs,
                                   ticker_interval=strategy.ticker_interval,
                                   refresh_pairs=args.refresh_pairs,
-                                  timerange=timerange)
+                                  timerange=timerange,
+                                  jobs=args.jobs)
     max_open_trades = 0
     if args.realistic_simulation:
         logger.info('Using max_open_trades: %s ...', config['max_open_trades'])
         max_open_trades = config['max_open_trades']
 
     # Monkey patch config
-    from freqtrade import main
     main._CONF = config
 
-    preprocessed = optimize.tickerdata_to_dataframe(data)
+    preprocessed = optimize.tickerdata_to_dataframe(data, jobs=args.jobs, config=config)
     # Print timeframe
     min_date, max_date = get_timeframe(preprocessed)
     logger.info('Measuring data from %s up to %s (%s days)..',
@@ -223,9 +782,14 @@ def start(args):
                         'realistic': args.realistic_simulation,
                         'sell_profit_only': sell_profit_only,
                         'use_sell_signal': use_sell_signal,
-                        'record': args.export
+                        'record': args.export,
+                        'jobs': args.jobs,
+                        'timeline': args.timeline
                         })
     logger.info(
         '\n==================================== BACKTESTING REPORT ====================================\n%s',  # noqa
         generate_text_table(data, results, config['stake_currency'])
     )
+    if profile:
+        profiler.report(profile, args.profile)
+        profiler.disable()
@@ -1,32 +1,36 @@
 # pragma pylint: disable=missing-docstring,W0212,W0603
 
 
+import heapq
 import json
 import logging
+import multiprocessing
 import os
-import pickle
 import signal
 import sys
-from functools import reduce
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from functools import partial, reduce
 from math import exp
 from operator import itemgetter
-from typing import Dict, Any, Callable
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
 
 import numpy
 import talib.abstract as ta
-from hyperopt import STATUS_FAIL, STATUS_OK, Trials, fmin, hp, space_eval, tpe
+from hyperopt import STATUS_FAIL, STATUS_OK, Trials, base, fmin, hp, pyll, space_eval, tpe
 from hyperopt.mongoexp import MongoTrials
-from pandas import DataFrame
+from hyperopt.utils import coarse_utcnow
+from pandas import DataFrame, Series
 
 import freqtrade.vendor.qtpylib.indicators as qtpylib
-# Monkey patch config
-from freqtrade import main  # noqa; noqa
 from freqtrade import exchange, misc, optimize
 from freqtrade.exchange import Bittrex
 from freqtrade.misc import load_config
-from freqtrade.optimize import backtesting
+from freqtrade.optimize import PreprocessedData, backtesting, profiler
 from freqtrade.optimize.backtesting import backtest
-from freqtrade.strategy.strategy import Strategy
+from freqtrade.strategy.strategy import Strategy, StrategyParameters
 from user_data.hyperopt_conf import hyperopt_optimize_conf
 
 # Remove noisy log messages
@@ -37,9 +41,6 @@ logger = logging.getLogger(__name__)
 
 # set TARGET_TRADES to suit your number concurrent trades so its realistic to the number of days
 TARGET_TRADES = 600
-TOTAL_TRIES = 0
-_CURRENT_TRIES = 0
-CURRENT_BEST_LOSS = 100
 
 # max average trade duration in minutes
 # if eval ends with higher value, we consider it a failed eval
@@ -50,15 +51,18 @@ MAX_ACCEPTED_TRADE_DURATION = 300
 # check that the reported Σ% values do not exceed this!
 EXPECTED_MAX_PROFIT = 3.0
 
-# Configuration and data used by hyperopt
-PROCESSED = None  # optimize.preprocess(optimize.load_data())
+# Configuration used by hyperopt
 OPTIMIZE_CONFIG = hyperopt_optimize_conf()
 
-# Hyperopt Trials
-TRIALS_FILE = os.path.join('user_data', 'hyperopt_trials.pickle')
-TRIALS = Trials()
+# Hyperopt trial journal, one finished evaluation per line
+TRIALS_FILE = os.path.join('user_data', 'hyperopt_trials.jsonl')
 
-main._CONF = OPTIMIZE_CONFIG
+# Hyperopt progress statistics, refreshed every --progress epochs
+STATUS_FILE = os.path.join('user_data', 'hyperopt_status.json')
+
+# Successive halving promotes the best 1/HALVING_ETA of the candidates of a rung
+# to the next one, which backtests HALVING_ETA times more data
+HALVING_ETA = 3
 
 
 def populate_indicators(dataframe: DataFrame) -> DataFrame:
@@ -181,18 +185,203 @@ def populate_indicators(dataframe: DataFrame) -> DataFrame:
     return dataframe
 
 
-def save_trials(trials, trials_path=TRIALS_FILE):
-    """Save hyperopt trials to file"""
-    logger.info('Saving Trials to \'{}\''.format(trials_path))
-    pickle.dump(trials, open(trials_path, 'wb'))
+class TrialJournal(object):
+    """
+    Append-only JSON Lines journal of the finished hyperopt evaluations.
+    Every evaluation is written to the file as soon as it is finished, so a
+    killed hyperopt can be resumed from all the evaluations it completed.
+    """
 
+    def __init__(self, filename: str = TRIALS_FILE) -> None:
+        self.filename = filename
+        self._writer: Optional[misc.JsonLinesWriter] = None
+
+    def append(self, vals: Dict[str, List], params: Dict[str, Any],
+               evaluation: Dict[str, Any]) -> None:
+        """
+        Records one finished evaluation
+        :param vals: parameters as stored by hyperopt, trial['misc']['vals']
+        :param params: parameters given to the objective function
+        :param evaluation: result of the objective function
+        """
+        if self._writer is None:
+            if os.path.exists(self.filename):
+                self._truncate_incomplete_line()
+            self._writer = misc.JsonLinesWriter(self.filename, batch_size=1, mode='a')
+        self._writer.write({
+            'loss': evaluation['loss'],
+            'status': evaluation['status'],
+            'result': evaluation.get('result'),
+            'params': params,
+            'vals': {key: [value.item() if isinstance(value, numpy.generic) else value
+                           for value in values]
+                     for key, values in vals.items()},
+        })
 
-def read_trials(trials_path=TRIALS_FILE):
-    """Read hyperopt trials file"""
-    logger.info('Reading Trials from \'{}\''.format(trials_path))
-    trials = pickle.load(open(trials_path, 'rb'))
-    os.remove(trials_path)
-    return trials
+    def _truncate_incomplete_line(self) -> None:
+        """ Cuts off a last line left incomplete by a killed process, before appending """
+        with open(self.filename, 'rb+') as file:
+            end = position = file.seek(0, os.SEEK_END)
+            while position > 0:
+                start = max(0, position - 4096)
+                file.seek(start)
+                newline = file.read(position - start).rfind(b'\n')
+                if newline != -1:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position != end:
+                logger.warning('Truncating incomplete last line of \'%s\'', self.filename)
+                file.truncate(position)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """
+        Reads the journal one record at a time. A last line left incomplete
+        by a killed process is skipped.
+        """
+        with open(self.filename) as file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning('Skipping incomplete line of \'%s\'', self.filename)
+
+    def best(self, count: int) -> List[Dict[str, Any]]:
+        """
+        :return: the count successful evaluations with the lowest loss, best first.
+                 The journal is streamed, it is never loaded as a whole.
+        """
+        return heapq.nsmallest(count,
+                               (record for record in self.records()
+                                if record['status'] == STATUS_OK),
+                               key=itemgetter('loss'))
+
+    def read_trials(self) -> Trials:
+        """ :return: hyperopt Trials holding the journaled evaluations, to resume from """
+        logger.info('Reading Trials from \'{}\''.format(self.filename))
+        records = list(self.records())
+        trials = Trials()
+        tids = trials.new_trial_ids(len(records))
+        results, miscs = [], []
+        for tid, record in zip(tids, records):
+            result = {'loss': record['loss'], 'status': record['status']}
+            if record['result'] is not None:
+                result['result'] = record['result']
+            results.append(result)
+            miscs.append({
+                'tid': tid,
+                'cmd': ('domain_attachment', 'FMinIter_Domain'),
+                'workdir': None,
+                'idxs': {key: [tid] if values else [] for key, values in record['vals'].items()},
+                'vals': record['vals'],
+            })
+        docs = trials.new_trial_docs(tids, [None] * len(tids), results, miscs)
+        for doc in docs:
+            doc['state'] = base.JOB_STATE_DONE
+            doc['refresh_time'] = coarse_utcnow()
+        trials.insert_trial_docs(docs)
+        trials.refresh()
+        return trials
+
+
+class HyperoptProgress(object):
+    """
+    Throughput and latency of a hyperopt run: the time of every epoch, and the time
+    spent suggesting parameters, backtesting and computing losses. The statistics are
+    logged and written to a JSON status file every interval epochs.
+    """
+
+    PHASES = ('suggest', 'backtest', 'loss')
+
+    def __init__(self, interval: int = 0, filename: Optional[str] = None) -> None:
+        """
+        :param interval: number of epochs between two reports, 0 to never report
+        :param filename: JSON file the reports are written to, if any
+        """
+        self.interval = interval
+        self.filename = filename
+        self.begin(0)
+
+    def begin(self, epochs: int) -> None:
+        """ Starts measuring a run of the given number of epochs """
+        self.total_epochs = epochs
+        self.epoch_seconds: List[float] = []
+        self.seconds = OrderedDict((name, 0.0) for name in self.PHASES)
+        self.suggestions = 0
+        self.started = self.last_epoch = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """ Adds the wall clock time of the with block to the given phase """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+
+    def suggested(self, count: int, seconds: float) -> None:
+        """ Counts count parameter sets suggested in the given time """
+        self.suggestions += count
+        self.seconds['suggest'] += seconds
+
+    def since_last_epoch(self) -> float:
+        return time.perf_counter() - self.last_epoch
+
+    def epochs_done(self, count: int = 1) -> bool:
+        """
+        Records count epochs finished together, since the previous ones
+        :return: True if a report is due
+        """
+        now = time.perf_counter()
+        self.epoch_seconds.extend([(now - self.last_epoch) / count] * count)
+        self.last_epoch = now
+        done = len(self.epoch_seconds)
+        return self.interval > 0 and done // self.interval > (done - count) // self.interval
+
+    def statistics(self) -> Dict[str, Any]:
+        """ :return: json.dump friendly dict of the statistics of the run so far """
+        elapsed = time.perf_counter() - self.started
+        epochs = len(self.epoch_seconds)
+        evals_per_sec = epochs / elapsed if elapsed else 0.0
+        return {
+            'time': datetime.utcnow().isoformat(),
+            'epochs': epochs,
+            'total_epochs': self.total_epochs,
+            'elapsed': elapsed,
+            'evals_per_sec': evals_per_sec,
+            'epoch_mean': float(numpy.mean(self.epoch_seconds)) if epochs else 0.0,
+            'epoch_p95': float(numpy.percentile(self.epoch_seconds, 95)) if epochs else 0.0,
+            'suggestions_per_sec': (self.suggestions / self.seconds['suggest']
+                                    if self.seconds['suggest'] else 0.0),
+            'eta': ((self.total_epochs - epochs) / evals_per_sec
+                    if evals_per_sec else None),
+            'phases': dict(self.seconds),
+        }
+
+    def report(self, status: Dict[str, Any]) -> None:
+        """
+        Logs the statistics, and replaces the status file with them
+        :param status: more values to write to the status file
+        """
+        stats = self.statistics()
+        logger.info(
+            '{}/{} epochs. {:.2f} evals/s. Epoch {:.3f}s mean, {:.3f}s p95. '
+            '{:.1f} suggestions/s. ETA {}. Time in suggest {:.0f}%, backtest {:.0f}%, '
+            'loss {:.0f}%'.format(
+                stats['epochs'], stats['total_epochs'], stats['evals_per_sec'],
+                stats['epoch_mean'], stats['epoch_p95'], stats['suggestions_per_sec'],
+                timedelta(seconds=round(stats['eta'] or 0)),
+                *(seconds / stats['elapsed'] * 100.0 if stats['elapsed'] else 0.0
+                  for seconds in self.seconds.values())))
+        if self.filename:
+            # write and rename, monitors never read a half written file
+            misc.file_dump_json(self.filename + '.tmp', {**status, **stats})
+            os.replace(self.filename + '.tmp', self.filename)
 
 
 def log_trials_result(trials):
@@ -201,22 +390,6 @@ def log_trials_result(trials):
     logger.info('Best result:\n%s\nwith values:\n%s', results, vals)
 
 
-def log_results(results):
-    """ log results if it is better than any previous evaluation """
-    global CURRENT_BEST_LOSS
-
-    if results['loss'] < CURRENT_BEST_LOSS:
-        CURRENT_BEST_LOSS = results['loss']
-        logger.info('{:5d}/{}: {}. Loss {:.5f}'.format(
-            results['current_tries'],
-            results['total_tries'],
-            results['result'],
-            results['loss']))
-    else:
-        print('.', end='')
-        sys.stdout.flush()
-
-
 def calculate_loss(total_profit: float, trade_count: int, trade_duration: float):
     """ objective function, returns smaller number for more optimal results """
     trade_loss = 1 - 0.25 * exp(-(trade_count - TARGET_TRADES) ** 2 / 10 ** 5.8)
@@ -329,98 +502,286 @@ def hyperopt_space(selected_spaces: str) -> Dict[str, Any]:
     return spaces
 
 
-def buy_strategy_generator(params: Dict[str, Any]) -> Callable:
+# Guards enabled or disabled by the buy space
+GUARDS = {
+    'uptrend_long_ema': lambda dataframe: dataframe['ema50'] > dataframe['ema100'],
+    'macd_below_zero': lambda dataframe: dataframe['macd'] < 0,
+    'uptrend_short_ema': lambda dataframe: dataframe['ema5'] > dataframe['ema10'],
+    'over_sar': lambda dataframe: dataframe['close'] > dataframe['sar'],
+    'green_candle': lambda dataframe: dataframe['close'] > dataframe['open'],
+    'uptrend_sma': lambda dataframe: dataframe['sma'] > dataframe['sma'].shift(1),
+}
+
+# Guards comparing an indicator with the 'value' drawn from the buy space
+THRESHOLD_GUARDS = {
+    'mfi': lambda dataframe, value: dataframe['mfi'] < value,
+    'fastd': lambda dataframe, value: dataframe['fastd'] < value,
+    'adx': lambda dataframe, value: dataframe['adx'] > value,
+    'rsi': lambda dataframe, value: dataframe['rsi'] < value,
+}
+
+TRIGGERS = {
+    'lower_bb': lambda dataframe: (
+        dataframe['close'] < dataframe['bb_lowerband']
+    ),
+    'lower_bb_tema': lambda dataframe: (
+        dataframe['tema'] < dataframe['bb_lowerband']
+    ),
+    'faststoch10': lambda dataframe: (qtpylib.crossed_above(
+        dataframe['fastd'], 10.0
+    )),
+    'ao_cross_zero': lambda dataframe: (qtpylib.crossed_above(
+        dataframe['ao'], 0.0
+    )),
+    'ema3_cross_ema10': lambda dataframe: (qtpylib.crossed_above(
+        dataframe['ema3'], dataframe['ema10']
+    )),
+    'macd_cross_signal': lambda dataframe: (qtpylib.crossed_above(
+        dataframe['macd'], dataframe['macdsignal']
+    )),
+    'sar_reversal': lambda dataframe: (qtpylib.crossed_above(
+        dataframe['close'], dataframe['sar']
+    )),
+    'ht_sine': lambda dataframe: (qtpylib.crossed_above(
+        dataframe['htleadsine'], dataframe['htsine']
+    )),
+    'heiken_reversal_bull': lambda dataframe: (
+        (qtpylib.crossed_above(dataframe['ha_close'], dataframe['ha_open'])) &
+        (dataframe['ha_low'] == dataframe['ha_open'])
+    ),
+    'di_cross': lambda dataframe: (qtpylib.crossed_above(
+        dataframe['plus_di'], dataframe['minus_di']
+    )),
+}
+
+
+def buy_condition_keys(params: Dict[str, Any]) -> List[Tuple]:
+    """
+    Lists the conditions of the buy signal for the given buy space parameters
+    :return: list of ('guard', name), ('threshold', name, value) and ('trigger', type) keys
+    """
+    keys: List[Tuple] = [('guard', name) for name in GUARDS
+                         if name in params and params[name]['enabled']]
+    keys.extend(('threshold', name, params[name]['value']) for name in THRESHOLD_GUARDS
+                if name in params and params[name]['enabled'])
+    keys.append(('trigger', params['trigger']['type']))
+    return keys
+
+
+def buy_condition(dataframe: DataFrame, key: Tuple) -> Series:
+    """ Computes the buy condition of a buy_condition_keys() key """
+    if key[0] == 'guard':
+        return GUARDS[key[1]](dataframe)
+    if key[0] == 'threshold':
+        return THRESHOLD_GUARDS[key[1]](dataframe, key[2])
+    return TRIGGERS[key[1]](dataframe)
+
+
+class BuySignalCache(object):
+    """
+    Buy conditions of the processed dataframes, packed with numpy.packbits.
+    A condition is computed the first time an epoch uses it on a dataframe,
+    later epochs only AND the packed arrays together.
+    The dataframes are told apart by identity, so they must not be modified
+    between epochs (except for the buy and sell columns).
+    """
+
+    def __init__(self) -> None:
+        self._frames: Dict[int, Tuple[DataFrame, Dict[Tuple, numpy.ndarray]]] = {}
+
+    def buy_signal(self, dataframe: DataFrame, keys: List[Tuple]) -> numpy.ndarray:
+        """
+        :param keys: conditions from buy_condition_keys()
+        :return: bool array of the rows meeting all the conditions
+        """
+        entry = self._frames.get(id(dataframe))
+        if entry is None or entry[0] is not dataframe:
+            entry = self._frames[id(dataframe)] = (dataframe, {})
+        packed = entry[1]
+        signal = None
+        for key in keys:
+            if key not in packed:
+                packed[key] = numpy.packbits(buy_condition(dataframe, key).values)
+            signal = packed[key] if signal is None else signal & packed[key]
+        return numpy.unpackbits(signal)[:len(dataframe)].astype(bool)
+
+
+def buy_strategy_generator(params: Dict[str, Any],
+                           cache: Optional[BuySignalCache] = None) -> Callable:
     """
     Define the buy strategy parameters to be used by hyperopt
+    :param cache: BuySignalCache to take the conditions from, instead of
+                  computing them on every call
     """
-    def populate_buy_trend(dataframe: DataFrame) -> DataFrame:
-        conditions = []
-        # GUARDS AND TRENDS
-        if 'uptrend_long_ema' in params and params['uptrend_long_ema']['enabled']:
-            conditions.append(dataframe['ema50'] > dataframe['ema100'])
-        if 'macd_below_zero' in params and params['macd_below_zero']['enabled']:
-            conditions.append(dataframe['macd'] < 0)
-        if 'uptrend_short_ema' in params and params['uptrend_short_ema']['enabled']:
-            conditions.append(dataframe['ema5'] > dataframe['ema10'])
-        if 'mfi' in params and params['mfi']['enabled']:
-            conditions.append(dataframe['mfi'] < params['mfi']['value'])
-        if 'fastd' in params and params['fastd']['enabled']:
-            conditions.append(dataframe['fastd'] < params['fastd']['value'])
-        if 'adx' in params and params['adx']['enabled']:
-            conditions.append(dataframe['adx'] > params['adx']['value'])
-        if 'rsi' in params and params['rsi']['enabled']:
-            conditions.append(dataframe['rsi'] < params['rsi']['value'])
-        if 'over_sar' in params and params['over_sar']['enabled']:
-            conditions.append(dataframe['close'] > dataframe['sar'])
-        if 'green_candle' in params and params['green_candle']['enabled']:
-            conditions.append(dataframe['close'] > dataframe['open'])
-        if 'uptrend_sma' in params and params['uptrend_sma']['enabled']:
-            prevsma = dataframe['sma'].shift(1)
-            conditions.append(dataframe['sma'] > prevsma)
-
-        # TRIGGERS
-        triggers = {
-            'lower_bb': (
-                dataframe['close'] < dataframe['bb_lowerband']
-            ),
-            'lower_bb_tema': (
-                dataframe['tema'] < dataframe['bb_lowerband']
-            ),
-            'faststoch10': (qtpylib.crossed_above(
-                dataframe['fastd'], 10.0
-            )),
-            'ao_cross_zero': (qtpylib.crossed_above(
-                dataframe['ao'], 0.0
-            )),
-            'ema3_cross_ema10': (qtpylib.crossed_above(
-                dataframe['ema3'], dataframe['ema10']
-            )),
-            'macd_cross_signal': (qtpylib.crossed_above(
-                dataframe['macd'], dataframe['macdsignal']
-            )),
-            'sar_reversal': (qtpylib.crossed_above(
-                dataframe['close'], dataframe['sar']
-            )),
-            'ht_sine': (qtpylib.crossed_above(
-                dataframe['htleadsine'], dataframe['htsine']
-            )),
-            'heiken_reversal_bull': (
-                (qtpylib.crossed_above(dataframe['ha_close'], dataframe['ha_open'])) &
-                (dataframe['ha_low'] == dataframe['ha_open'])
-            ),
-            'di_cross': (qtpylib.crossed_above(
-                dataframe['plus_di'], dataframe['minus_di']
-            )),
-        }
-        conditions.append(triggers.get(params['trigger']['type']))
+    keys = buy_condition_keys(params)
 
-        dataframe.loc[
-            reduce(lambda x, y: x & y, conditions),
-            'buy'] = 1
+    def populate_buy_trend(dataframe: DataFrame) -> DataFrame:
+        if cache is not None:
+            signal = cache.buy_signal(dataframe, keys)
+        else:
+            signal = reduce(lambda x, y: x & y,
+                            (buy_condition(dataframe, key) for key in keys))
+        dataframe.loc[signal, 'buy'] = 1
 
         return dataframe
 
     return populate_buy_trend
 
 
-def generate_optimizer(args):
-    def optimizer(params):
-        global _CURRENT_TRIES
+def slice_processed(processed: Dict[str, DataFrame], fraction: float) -> PreprocessedData:
+    """
+    :param fraction: part of the timeframe to keep, the most recent one
+    :return: copies of the dataframes holding their rows in the last fraction of the
+             timeframe of all pairs
+    """
+    min_date, max_date = backtesting.get_timeframe(processed)
+    start_date = (max_date - (max_date - min_date) * fraction).datetime
+    return PreprocessedData(
+        (pair, pair_data[pair_data['date'] >= start_date].reset_index(drop=True))
+        for pair, pair_data in processed.items())
 
-        strategy = Strategy()
-        if has_space(args.spaces, 'roi'):
-            strategy.minimal_roi = generate_roi_table(params)
 
-        if has_space(args.spaces, 'buy'):
-            backtesting.populate_buy_trend = buy_strategy_generator(params)
+def params_key(params: Dict[str, Any]) -> str:
+    """ :return: canonical form of a parameter set, the same for equal parameters """
+    return json.dumps(params, sort_keys=True)
 
-        if has_space(args.spaces, 'stoploss'):
-            strategy.stoploss = params['stoploss']
 
-        results = backtest({'stake_amount': OPTIMIZE_CONFIG['stake_amount'],
-                            'processed': PROCESSED,
-                            'realistic': args.realistic_simulation,
-                            })
+class HyperoptRunner(object):
+    """
+    One hyperopt study. The runner owns its processed data, trials and strategy
+    parameters, and hands the buy signal function and the sell parameters of an
+    epoch to backtest() explicitly, so several runners can live in one process.
+    """
+
+    def __init__(self, processed: Dict[str, DataFrame], spaces: List[str], config: Dict,
+                 realistic_simulation: bool = False, trials: Optional[Trials] = None,
+                 strategy: Optional[StrategyParameters] = None,
+                 optimize_config: Optional[Dict] = None,
+                 journal: Optional[TrialJournal] = None,
+                 progress: Optional[HyperoptProgress] = None) -> None:
+        """
+        :param processed: preprocessed data, see optimize.preprocess()
+        :param spaces: spaces to optimize, see hyperopt_space()
+        :param config: bot configuration, used to load the strategy in spawned workers
+        :param strategy: parameters of the spaces that are not optimized,
+                         defaults to the ones of the Strategy
+        :param optimize_config: stake amount and experimental settings of the backtests,
+                                defaults to hyperopt_optimize_conf()
+        :param journal: TrialJournal recording every finished evaluation, if any
+        :param progress: HyperoptProgress measuring the runs, defaults to one that
+                         never reports
+        """
+        self.processed = processed
+        self.spaces = spaces
+        self.config = config
+        self.realistic_simulation = realistic_simulation
+        self.trials = trials if trials is not None else Trials()
+        self.strategy = strategy or StrategyParameters.from_strategy()
+        self.optimize_config = optimize_config or OPTIMIZE_CONFIG
+        self.journal = journal
+        self.progress = progress or HyperoptProgress()
+        self.total_tries = 0
+        self.current_tries = 0
+        self.current_best_loss = 100
+        self.buy_signal_cache = BuySignalCache()
+        # evaluations by params_key(), TPE proposes the same parameters again and again
+        self.evaluations: Dict[str, Dict[str, Any]] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # slices of the processed data by fraction, kept for the BuySignalCache
+        self.slices: Dict[float, Dict[str, DataFrame]] = {1.0: processed}
+        # simulation columns of the slices, the signals are the same every epoch
+        # when the buy space is not optimized
+        self.columns: Dict[float, Dict[str, Dict[str, numpy.ndarray]]] = {}
+
+    def space(self) -> Dict[str, Any]:
+        return hyperopt_space(self.spaces)
+
+    def processed_slice(self, fraction: float) -> Dict[str, DataFrame]:
+        """ :return: the processed data of the last fraction of the timeframe """
+        if fraction not in self.slices:
+            self.slices[fraction] = slice_processed(self.processed, fraction)
+        return self.slices[fraction]
+
+    def signal_columns(self, fraction: float) -> Dict[str, Dict[str, numpy.ndarray]]:
+        """
+        :return: simulation columns of the processed slice with the signals of the
+                 strategy, computed the first time the slice is backtested
+        """
+        if fraction not in self.columns:
+            self.columns[fraction] = {
+                pair: backtesting.get_pair_columns(pair_data, pair)
+                for pair, pair_data in self.processed_slice(fraction).items()}
+        return self.columns[fraction]
+
+    def strategy_parameters(self, params: Dict[str, Any]) -> StrategyParameters:
+        """
+        :param params: parameters drawn from hyperopt_space()
+        :return: stoploss and ROI table of an epoch
+        """
+        minimal_roi = self.strategy.minimal_roi
+        if has_space(self.spaces, 'roi'):
+            minimal_roi = generate_roi_table(params)
+
+        stoploss = self.strategy.stoploss
+        if has_space(self.spaces, 'stoploss'):
+            stoploss = params['stoploss']
+        return StrategyParameters(minimal_roi, stoploss)
+
+    def backtest_args(self, params: Dict[str, Any], fraction: float = 1.0) -> Dict[str, Any]:
+        """
+        :param params: parameters drawn from hyperopt_space()
+        :param fraction: part of the timeframe to backtest, see processed_slice()
+        :return: backtest() arguments of an epoch
+        """
+        args = {'stake_amount': self.optimize_config['stake_amount'],
+                'processed': self.processed_slice(fraction),
+                'realistic': self.realistic_simulation,
+                'strategy': self.strategy_parameters(params),
+                'experimental': self.optimize_config.get('experimental', {}),
+                }
+        if has_space(self.spaces, 'buy'):
+            args['populate_buy_trend'] = buy_strategy_generator(params, self.buy_signal_cache)
+        else:
+            args['columns'] = self.signal_columns(fraction)
+        return args
+
+    def evaluate(self, params: Dict[str, Any], fraction: float = 1.0) -> Dict[str, Any]:
+        """
+        Backtests the strategy with the given hyperopt parameters
+        :param params: parameters drawn from hyperopt_space()
+        :param fraction: part of the timeframe to backtest, the most recent one
+        :return: hyperopt result dict, see evaluate_results()
+        """
+        with self.progress.phase('backtest'):
+            results = backtest(self.backtest_args(params, fraction))
+        with self.progress.phase('loss'):
+            return self.evaluate_results(results, fraction)
+
+    def evaluate_batch(self, params: List[Dict[str, Any]],
+                       fraction: float = 1.0) -> List[Dict[str, Any]]:
+        """
+        evaluate() of several parameter sets. Without the buy space they share their
+        signals, and are backtested in one pass by backtest_candidates().
+        """
+        if has_space(self.spaces, 'buy') or not params:
+            return [self.evaluate(param, fraction) for param in params]
+        with self.progress.phase('backtest'):
+            results = backtesting.backtest_candidates(
+                self.backtest_args(params[0], fraction),
+                [self.strategy_parameters(param) for param in params])
+        with self.progress.phase('loss'):
+            return [self.evaluate_results(result, fraction) for result in results]
+
+    @staticmethod
+    def evaluate_results(results: DataFrame, fraction: float = 1.0) -> Dict[str, Any]:
+        """
+        :param results: backtest() result of an epoch
+        :param fraction: part of the timeframe that was backtested. The profit and trade
+                         count are extrapolated to the whole timeframe to compute the loss.
+        :return: hyperopt result dict with loss and status, and the result explanation
+                 if the trades are acceptable
+        """
         result_explanation = format_results(results)
 
         total_profit = results.profit_percent.sum()
@@ -428,22 +789,13 @@ def generate_optimizer(args):
         trade_duration = results.duration.mean()
 
         if trade_count == 0 or trade_duration > MAX_ACCEPTED_TRADE_DURATION:
-            print('.', end='')
             return {
                 'status': STATUS_FAIL,
                 'loss': float('inf')
             }
 
-        loss = calculate_loss(total_profit, trade_count, trade_duration)
-
-        _CURRENT_TRIES += 1
-
-        log_results({
-            'loss': loss,
-            'current_tries': _CURRENT_TRIES,
-            'total_tries': TOTAL_TRIES,
-            'result': result_explanation,
-        })
+        loss = calculate_loss(total_profit / fraction, round(trade_count / fraction),
+                              trade_duration)
 
         return {
             'loss': loss,
@@ -451,7 +803,274 @@ def generate_optimizer(args):
             'result': result_explanation,
         }
 
-    return optimizer
+    def cached_evaluation(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Counts a cache hit or miss
+        :return: the evaluation of equal parameters, None if they were not evaluated yet
+        """
+        evaluation = self.evaluations.get(params_key(params))
+        if evaluation is None:
+            self.cache_misses += 1
+            return None
+        self.cache_hits += 1
+        return dict(evaluation)
+
+    def evaluate_cached(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """ evaluate(), only backtesting parameters that were not evaluated yet """
+        evaluation = self.cached_evaluation(params)
+        if evaluation is None:
+            evaluation = self.evaluate(params)
+            self.evaluations[params_key(params)] = dict(evaluation)
+        return evaluation
+
+    def log_results(self, results: Dict[str, Any]) -> None:
+        """ log results if it is better than any previous evaluation """
+        if results['loss'] < self.current_best_loss:
+            self.current_best_loss = results['loss']
+            logger.info('{:5d}/{}: {}. Loss {:.5f} (cache {} hits / {} misses)'.format(
+                results['current_tries'],
+                results['total_tries'],
+                results['result'],
+                results['loss'],
+                self.cache_hits,
+                self.cache_misses))
+        else:
+            print('.', end='')
+            sys.stdout.flush()
+
+    def log_evaluation(self, evaluation: Dict[str, Any]) -> None:
+        """ Prints a dot for failed evaluations, counts and logs the successful ones """
+        if evaluation['status'] != STATUS_OK:
+            print('.', end='')
+            return
+
+        self.current_tries += 1
+
+        self.log_results({
+            'loss': evaluation['loss'],
+            'current_tries': self.current_tries,
+            'total_tries': self.total_tries,
+            'result': evaluation['result'],
+        })
+
+    def record(self, trial: Dict[str, Any], params: Dict[str, Any],
+               evaluation: Dict[str, Any]) -> None:
+        """ Logs a finished evaluation of the given trial and adds it to the journal """
+        self.log_evaluation(evaluation)
+        if self.journal is not None:
+            self.journal.append(trial['misc']['vals'], params, evaluation)
+
+    def optimizer(self, expr, memo, ctrl) -> Dict[str, Any]:
+        """
+        Objective function given to fmin(), with pass_expr_memo_ctrl to know
+        the trial that is evaluated
+        """
+        # fmin() spends the time since the previous epoch in tpe.suggest
+        self.progress.suggested(1, self.progress.since_last_epoch())
+        params = pyll.rec_eval(expr, memo=memo)
+        evaluation = self.evaluate_cached(params)
+        self.record(ctrl.current_trial, params, evaluation)
+        if self.progress.epochs_done():
+            self.report_progress()
+        return evaluation
+
+    def resume(self, trials: Trials) -> None:
+        """ Continues the study from the given trials, and caches their evaluations """
+        self.trials = trials
+        self.current_tries = len(trials.results)
+        space = self.space()
+        for trial in trials.trials:
+            if trial['state'] == base.JOB_STATE_DONE:
+                params = space_eval(space, base.spec_from_misc(trial['misc']))
+                self.evaluations[params_key(params)] = dict(trial['result'])
+
+    def run(self, epochs: int, jobs: int = 1, halving: int = 0,
+            batch: int = 1) -> Dict[str, Any]:
+        """
+        Runs the given number of epochs more, with fmin() or on a process pool
+        :param jobs: number of processes evaluating the epochs
+        :param halving: number of rungs of successive_halving(), 0 to evaluate
+                        every epoch on all the data
+        :param batch: number of epochs suggested at a time and given to evaluate_batch(),
+                      in a single process
+        :return: best parameters found, as returned by fmin()
+        """
+        self.total_tries = len(self.trials.results) + epochs
+        self.progress.begin(epochs)
+        if halving > 1:
+            return self.run_halving(halving, jobs)
+        if jobs > 1:
+            return self.run_parallel(jobs)
+        if batch > 1:
+            return self.run_batches(batch, self.evaluate_batch)
+        return fmin(
+            fn=self.optimizer,
+            space=self.space(),
+            algo=tpe.suggest,
+            max_evals=self.total_tries,
+            trials=self.trials,
+            pass_expr_memo_ctrl=True
+        )
+
+    def pool(self, jobs: int) -> 'multiprocessing.pool.Pool':
+        """
+        :return: process pool evaluating epochs with _hyperopt_worker(). The processed
+                 data is sent to every worker once, when the pool starts.
+        """
+        initargs = (self.config, self.processed, self.spaces, self.realistic_simulation,
+                    self.strategy, self.optimize_config)
+        return multiprocessing.Pool(jobs, initializer=_init_hyperopt_worker, initargs=initargs)
+
+    def run_parallel(self, jobs: int) -> Dict[str, Any]:
+        """
+        Minimizes the loss like fmin() with tpe.suggest, but asks TPE for batches of
+        jobs suggestions and backtests each batch on a local process pool.
+        :return: best parameters found, as returned by fmin()
+        """
+        with self.pool(jobs) as pool:
+            return self.run_batches(jobs, partial(self.pool_evaluate, pool))
+
+    def run_halving(self, rungs: int, jobs: int = 1) -> Dict[str, Any]:
+        """
+        Minimizes the loss like fmin() with tpe.suggest, but evaluates batches of
+        suggestions with successive_halving(), on a process pool if jobs > 1.
+        :return: best parameters found, as returned by fmin()
+        """
+        batch_size = max(jobs, HALVING_ETA ** (rungs - 1))
+        if jobs > 1:
+            with self.pool(jobs) as pool:
+                return self.run_batches(batch_size, partial(
+                    self.successive_halving, rungs=rungs,
+                    evaluate=partial(self.pool_evaluate, pool)))
+        return self.run_batches(batch_size, partial(
+            self.successive_halving, rungs=rungs, evaluate=self.evaluate_batch))
+
+    def pool_evaluate(self, pool: 'multiprocessing.pool.Pool', params: List[Dict[str, Any]],
+                      fraction: float = 1.0) -> List[Dict[str, Any]]:
+        """
+        evaluate() of several parameter sets on a pool(). The losses are computed
+        by the workers, their time is measured as backtest time.
+        """
+        with self.progress.phase('backtest'):
+            return pool.starmap(_hyperopt_worker, [(param, fraction) for param in params])
+
+    def run_batches(self, batch_size: int,
+                    evaluate: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]
+                    ) -> Dict[str, Any]:
+        """
+        Asks TPE for batch_size suggestions at a time until total_tries is reached
+        :param evaluate: function returning the evaluations of a list of parameter sets,
+                         only called with the ones that were not evaluated yet
+        :return: best parameters found, as returned by fmin()
+        """
+        space = self.space()
+        domain = base.Domain(self.optimizer, space, pass_expr_memo_ctrl=True)
+        rstate = numpy.random.RandomState()
+        trials = self.trials
+        while len(trials.trials) < self.total_tries:
+            new_ids = trials.new_trial_ids(min(batch_size, self.total_tries - len(trials.trials)))
+            trials.refresh()
+            start = time.perf_counter()
+            new_trials = tpe.suggest(new_ids, domain, trials, rstate.randint(2 ** 31 - 1))
+            self.progress.suggested(len(new_trials), time.perf_counter() - start)
+            params = [space_eval(space, base.spec_from_misc(trial['misc']))
+                      for trial in new_trials]
+            keys = [params_key(param) for param in params]
+            # backtest the new parameter sets once, even if proposed twice in a batch
+            missing = OrderedDict((key, param) for key, param in zip(keys, params)
+                                  if key not in self.evaluations)
+            self.cache_misses += len(missing)
+            self.cache_hits += len(params) - len(missing)
+            for key, evaluation in zip(missing, evaluate(list(missing.values()))):
+                self.evaluations[key] = evaluation
+            for trial, param, key in zip(new_trials, params, keys):
+                evaluation = dict(self.evaluations[key])
+                self.record(trial, param, evaluation)
+                trial['state'] = base.JOB_STATE_DONE
+                trial['result'] = evaluation
+                trial['refresh_time'] = coarse_utcnow()
+            trials.insert_trial_docs(new_trials)
+            trials.refresh()
+            if self.progress.epochs_done(len(new_trials)):
+                self.report_progress()
+        return trials.argmin
+
+    def successive_halving(self, params: List[Dict[str, Any]], rungs: int,
+                           evaluate: Callable[[List[Dict[str, Any]], float],
+                                              List[Dict[str, Any]]]
+                           ) -> List[Dict[str, Any]]:
+        """
+        Backtests all the candidates on the last 1/HALVING_ETA**(rungs - 1) of the
+        timeframe, then promotes the best 1/HALVING_ETA of them to HALVING_ETA times
+        more data, rung after rung, until the survivors are backtested on all of it.
+        The pruned candidates are reported as failed, so TPE only models losses of
+        the whole timeframe.
+        :param evaluate: function returning the evaluate() results of a list of
+                         parameter sets on a fraction of the timeframe, like evaluate_batch()
+        :return: evaluations of the candidates
+        """
+        evaluations: List[Dict[str, Any]] = [{}] * len(params)
+        survivors = list(range(len(params)))
+        for rung in range(rungs):
+            fraction = 1 / HALVING_ETA ** (rungs - 1 - rung)
+            for number, evaluation in zip(survivors, evaluate(
+                    [params[number] for number in survivors], fraction)):
+                evaluations[number] = evaluation
+            if rung == rungs - 1:
+                break
+            survivors = [number for number in survivors
+                         if evaluations[number]['status'] == STATUS_OK]
+            survivors.sort(key=lambda number: evaluations[number]['loss'])
+            promoted = max(1, len(survivors) // HALVING_ETA)
+            for number in survivors[promoted:]:
+                evaluations[number] = {
+                    'status': STATUS_FAIL,
+                    'loss': float('inf'),
+                    'result': 'Pruned on {:.1%} of the timeframe: {} Loss {:.5f}'.format(
+                        fraction, evaluations[number]['result'], evaluations[number]['loss']),
+                }
+            survivors = survivors[:promoted]
+        return evaluations
+
+    def report_progress(self) -> None:
+        """ Reports the progress statistics, with the state of the study """
+        self.progress.report({
+            'current_tries': self.current_tries,
+            'total_tries': self.total_tries,
+            'best_loss': self.current_best_loss,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+        })
+
+    def signal_handler(self, sig, frame):
+        """Hyperopt SIGINT handler"""
+        logger.info('Hyperopt received {}'.format(signal.Signals(sig).name))
+
+        if self.journal is not None:
+            self.journal.close()
+        log_trials_result(self.trials)
+        sys.exit(0)
+
+
+# HyperoptRunner of a run_parallel() worker process
+_WORKER_RUNNER: Optional[HyperoptRunner] = None
+
+
+def _init_hyperopt_worker(config: Dict, *runner_args) -> None:
+    """ Creates the HyperoptRunner of a run_parallel() worker process """
+    global _WORKER_RUNNER
+
+    # SIGINT is handled by the main process, which saves the trials
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    backtesting._init_backtest_worker(config)
+    processed, spaces, realistic_simulation, strategy, optimize_config = runner_args
+    _WORKER_RUNNER = HyperoptRunner(processed, spaces, config,
+                                    realistic_simulation=realistic_simulation,
+                                    strategy=strategy, optimize_config=optimize_config)
+
+
+def _hyperopt_worker(params: Dict[str, Any], fraction: float = 1.0) -> Dict[str, Any]:
+    return _WORKER_RUNNER.evaluate(params, fraction)
 
 
 def format_results(results: DataFrame):
@@ -465,11 +1084,23 @@ def format_results(results: DataFrame):
             )
 
 
-def start(args):
-    global TOTAL_TRIES, PROCESSED, TRIALS, _CURRENT_TRIES
+def run_options(args) -> Tuple[int, int, int]:
+    """
+    :return: jobs, halving and batch arguments of HyperoptRunner.run(),
+             the mongodb workers evaluate the epochs one at a time
+    """
+    if args.mongodb:
+        return 1, 0, 1
+    if args.jobs > 1:
+        logger.info('Using %d processes ...', args.jobs)
+    if args.halving > 1:
+        logger.info('Using successive halving over %d rungs ...', args.halving)
+    elif args.jobs == 1 and args.batch > 1:
+        logger.info('Evaluating %d epochs at a time ...', args.batch)
+    return args.jobs, args.halving, args.batch
 
-    TOTAL_TRIES = args.epochs
 
+def start(args):
     exchange._API = Bittrex({'key': '', 'secret': ''})
 
     # Initialize logger
@@ -492,43 +1123,45 @@ def start(args):
     strategy = Strategy()
     strategy.init(config)
 
+    profile = profiler.enable() if args.profile is not None else None
+
     timerange = misc.parse_timerange(args.timerange)
     data = optimize.load_data(args.datadir, pairs=pairs,
                               ticker_interval=strategy.ticker_interval,
-                              timerange=timerange)
-    if has_space(args.spaces, 'buy'):
-        optimize.populate_indicators = populate_indicators
-    PROCESSED = optimize.tickerdata_to_dataframe(data)
+                              timerange=timerange,
+                              jobs=args.jobs)
+    indicators = populate_indicators if has_space(args.spaces, 'buy') else None
+    processed = optimize.tickerdata_to_dataframe(data, indicators, jobs=args.jobs,
+                                                 config=config)
+    progress = HyperoptProgress(args.progress, STATUS_FILE if args.progress else None)
+    runner = HyperoptRunner(processed, args.spaces, config,
+                            realistic_simulation=args.realistic_simulation,
+                            progress=progress)
+    journal = None
 
     if args.mongodb:
         logger.info('Using mongodb ...')
         logger.info('Start scripts/start-mongodb.sh and start-hyperopt-worker.sh manually!')
 
         db_name = 'freqtrade_hyperopt'
-        TRIALS = MongoTrials('mongo://127.0.0.1:1234/{}/jobs'.format(db_name), exp_key='exp1')
+        runner.trials = MongoTrials('mongo://127.0.0.1:1234/{}/jobs'.format(db_name),
+                                    exp_key='exp1')
     else:
         logger.info('Preparing Trials..')
-        signal.signal(signal.SIGINT, signal_handler)
-        # read trials file if we have one
-        if os.path.exists(TRIALS_FILE):
-            TRIALS = read_trials()
-
-            _CURRENT_TRIES = len(TRIALS.results)
-            TOTAL_TRIES = TOTAL_TRIES + _CURRENT_TRIES
+        signal.signal(signal.SIGINT, runner.signal_handler)
+        # resume from the trial journal if we have one
+        journal = TrialJournal(TRIALS_FILE)
+        if os.path.exists(journal.filename):
+            runner.resume(journal.read_trials())
             logger.info(
                 'Continuing with trials. Current: {}, Total: {}'
-                .format(_CURRENT_TRIES, TOTAL_TRIES))
+                .format(runner.current_tries, runner.current_tries + args.epochs))
+        runner.journal = journal
 
     try:
-        best_parameters = fmin(
-            fn=generate_optimizer(args),
-            space=hyperopt_space(args.spaces),
-            algo=tpe.suggest,
-            max_evals=TOTAL_TRIES,
-            trials=TRIALS
-        )
+        best_parameters = runner.run(args.epochs, *run_options(args))
 
-        results = sorted(TRIALS.results, key=itemgetter('loss'))
+        results = sorted(runner.trials.results, key=itemgetter('loss'))
         best_result = results[0]['result']
 
     except ValueError:
@@ -539,7 +1172,7 @@ def start(args):
     # Improve best parameter logging display
     if best_parameters:
         best_parameters = space_eval(
-            hyperopt_space(args.spaces),
+            runner.space(),
             best_parameters
         )
 
@@ -548,14 +1181,12 @@ def start(args):
         logger.info('ROI table:\n%s', generate_roi_table(best_parameters))
     logger.info('Best Result:\n%s', best_result)
 
-    # Store trials result to file to resume next time
-    save_trials(TRIALS)
-
-
-def signal_handler(sig, frame):
-    """Hyperopt SIGINT handler"""
-    logger.info('Hyperopt received {}'.format(signal.Signals(sig).name))
+    logger.info('Evaluation cache: %d hits, %d misses', runner.cache_hits, runner.cache_misses)
+    runner.report_progress()
+    if journal is not None:
+        journal.close()
+        logger.info('Trials journaled to \'%s\'', journal.filename)
 
-    save_trials(TRIALS)
-    log_trials_result(TRIALS)
-    sys.exit(0)
+    if profile:
+        profiler.report(profile, args.profile)
+        profiler.disable()
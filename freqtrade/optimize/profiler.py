@@ -0,0 +1,151 @@
+# pragma pylint: disable=missing-docstring
+"""
+Phase timers of backtesting and hyperopt, enabled with --profile.
+
+The phases are measured with the phase() context manager, which does
+nothing but yield a throwaway PhaseStats while profiling is disabled:
+
+    with profiler.phase('indicators', pair) as stats:
+        ...
+        stats.candles += len(dataframe)
+"""
+import logging
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from tabulate import tabulate
+
+from freqtrade import misc
+
+logger = logging.getLogger(__name__)
+
+
+class PhaseStats(object):
+    """ Time spent and rows processed by one phase of one pair """
+    __slots__ = ('calls', 'seconds', 'candles', 'signals')
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.seconds = 0.0
+        self.candles = 0
+        self.signals = 0
+
+    def add(self, other: 'PhaseStats') -> None:
+        self.calls += other.calls
+        self.seconds += other.seconds
+        self.candles += other.candles
+        self.signals += other.signals
+
+
+class Profiler(object):
+    """ Accumulates the PhaseStats per phase and pair, in the order they are first seen """
+
+    def __init__(self) -> None:
+        self.stats: Dict[Tuple[str, Optional[str]], PhaseStats] = OrderedDict()
+
+    @contextmanager
+    def phase(self, name: str, pair: Optional[str] = None) -> Iterator[PhaseStats]:
+        """
+        Measures the wall clock time of the with block
+        :param name: phase name, e.g. 'load_data' or 'simulation'
+        :param pair: pair the phase works on, None for phases over all pairs
+        :return: PhaseStats to add the candles and signals processed to
+        """
+        stats = self.stats.get((name, pair))
+        if stats is None:
+            stats = self.stats[(name, pair)] = PhaseStats()
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.seconds += time.perf_counter() - start
+            stats.calls += 1
+
+    def phase_totals(self) -> Dict[str, PhaseStats]:
+        """ :return: dict of phase -> PhaseStats summed over all pairs """
+        totals: Dict[str, PhaseStats] = OrderedDict()
+        for (name, _), stats in self.stats.items():
+            totals.setdefault(name, PhaseStats()).add(stats)
+        return totals
+
+    def rows(self) -> List[Dict]:
+        """
+        :return: one dict per phase and pair, followed by the phase total
+                 (pair 'ALL') for phases measured on several pairs
+        """
+        totals = self.phase_totals()
+        total_seconds = sum(stats.seconds for stats in totals.values())
+
+        def row(name: str, pair: Optional[str], stats: PhaseStats) -> Dict:
+            return {
+                'phase': name,
+                'pair': pair,
+                'calls': stats.calls,
+                'seconds': stats.seconds,
+                'percent': stats.seconds / total_seconds * 100.0 if total_seconds else 0.0,
+                'candles': stats.candles,
+                'signals': stats.signals,
+                'candles_per_sec': stats.candles / stats.seconds if stats.seconds else 0.0,
+                'signals_per_sec': stats.signals / stats.seconds if stats.seconds else 0.0,
+            }
+
+        rows = []
+        for name, total in totals.items():
+            pairs = [(pair, stats) for (phase, pair), stats in self.stats.items()
+                     if phase == name and pair is not None]
+            rows.extend(row(name, pair, stats) for pair, stats in pairs)
+            if len(pairs) != 1:
+                rows.append(row(name, 'ALL' if pairs else None, total))
+        return rows
+
+    def generate_table(self) -> str:
+        """ :return: the rows() pretty printed with tabulate """
+        headers = ['phase', 'pair', 'calls', 'seconds', '%', 'candles/s', 'signals/s']
+        floatfmt = ('s', 's', 'd', '.3f', '.1f', '.0f', '.0f')
+        return tabulate([[row['phase'], row['pair'] or '', row['calls'], row['seconds'],
+                          row['percent'], row['candles_per_sec'], row['signals_per_sec']]
+                         for row in self.rows()],
+                        headers=headers, floatfmt=floatfmt)
+
+    def dump_json(self, filename: str) -> None:
+        """ Writes the rows() to the given file """
+        misc.file_dump_json(filename, self.rows())
+
+
+_PROFILER: Optional[Profiler] = None
+
+
+def enable() -> Profiler:
+    """ Starts a new Profiler that the phase() hooks report to """
+    global _PROFILER
+    _PROFILER = Profiler()
+    return _PROFILER
+
+
+def disable() -> None:
+    global _PROFILER
+    _PROFILER = None
+
+
+@contextmanager
+def phase(name: str, pair: Optional[str] = None) -> Iterator[PhaseStats]:
+    """ Profiler.phase() of the enabled profiler, does nothing if profiling is disabled """
+    if _PROFILER is None:
+        yield PhaseStats()
+    else:
+        with _PROFILER.phase(name, pair) as stats:
+            yield stats
+
+
+def report(profiler: Profiler, export: Optional[str] = None) -> None:
+    """
+    Logs the profiler table and dumps it as json if a filename is given
+    :param export: json file name, or None
+    """
+    logger.info('\n=================== PROFILE ===================\n%s',
+                profiler.generate_table())
+    if export:
+        logger.info('Dumping profile to %s', export)
+        profiler.dump_json(export)
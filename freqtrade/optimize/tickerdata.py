@@ -0,0 +1,173 @@
+# pragma pylint: disable=missing-docstring
+"""
+Binary columnar cache of the ticker data files.
+
+{pair}-{interval}.json(.gz) is converted once into the directory {pair}-{interval}.columns:
+dates.npy holds the candle dates as int64 nanoseconds since epoch (UTC), values.npy the
+float64 open, high, low, close, volume and base volume, one row per column (NaN base volume
+for candles without one). Loading it skips the json
+parsing and the parsing of the date strings. The cache is rebuilt when the json file changes.
+
+The cache is memory-mapped copy-on-write and the DataFrames of to_dataframe() wrap the
+mapped values without copying them: processes loading the same pairs share one page cache
+copy of the candles, only the dates and the indicators are private to each process.
+"""
+import gzip
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+from pandas import DataFrame, Timestamp, to_datetime
+
+logger = logging.getLogger(__name__)
+
+# Ticker keys of the rows of values.npy, 'BV' is dropped by parse_ticker_dataframe()
+VALUE_KEYS = ['O', 'H', 'L', 'C', 'V', 'BV']
+VALUE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+CACHE_SUFFIX = '.columns'
+CACHE_FORMAT = 3
+CACHE_FILES = ['dates', 'values']
+META_FILE = 'meta.json'
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+
+class TickerColumns(object):
+    """
+    Ticker history held as columns: int64 ns dates and a (6, candles) array of the float64
+    VALUE_KEYS. It can be measured, sliced, indexed and iterated like the list of ticker
+    dicts returned by exchange.get_ticker_history(), slices are views of the same arrays.
+    analyze.parse_ticker_dataframe() uses to_dataframe().
+    """
+    __slots__ = ('dates', 'values')
+
+    def __init__(self, dates: np.ndarray, values: np.ndarray) -> None:
+        self.dates = dates
+        self.values = values
+
+    @classmethod
+    def from_tickers(cls, tickers: List[Dict]) -> 'TickerColumns':
+        dates = to_datetime([ticker['T'] for ticker in tickers],
+                            utc=True, infer_datetime_format=True)
+        values = np.array([[ticker.get(key, np.nan) for ticker in tickers]
+                           for key in VALUE_KEYS], dtype=np.float64)
+        return cls(np.asarray(dates.asi8, dtype=np.int64), values)
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        """ :return: dict of ticker key -> column """
+        columns = dict(zip(VALUE_KEYS, self.values))
+        columns['T'] = self.dates
+        return columns
+
+    def to_dataframe(self) -> DataFrame:
+        """
+        :return: DataFrame of the columns of parse_ticker_dataframe(), the open, high, low,
+                 close and volume are a view of the (memory-mapped) values
+        """
+        frame = DataFrame(self.values[:len(VALUE_COLUMNS)].T, columns=VALUE_COLUMNS, copy=False)
+        frame['date'] = to_datetime(self.dates, utc=True)
+        return frame
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return TickerColumns(self.dates[item], self.values[:, item])
+        ticker = dict(zip(VALUE_KEYS, self.values[:, item].tolist()))
+        ticker['T'] = Timestamp(int(self.dates[item])).strftime(DATE_FORMAT)
+        if np.isnan(ticker['BV']):
+            del ticker['BV']
+        return ticker
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+def cache_path(filename: str) -> str:
+    """ :return: directory caching the columns of the given .json or .json.gz file """
+    if filename.endswith('.gz'):
+        filename = filename[:-len('.gz')]
+    return os.path.splitext(filename)[0] + CACHE_SUFFIX
+
+
+def source_stat(filename: str) -> Dict:
+    """ :return: what identifies the version of a json file the cache was built from """
+    stat = os.stat(filename)
+    return {'file': os.path.basename(filename), 'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size}
+
+
+def read_cache(filename: str) -> Optional[TickerColumns]:
+    """
+    :return: the cached columns of the json file, memory-mapped copy-on-write,
+             None when the cache is missing or was built from another version of the file
+    """
+    path = cache_path(filename)
+    try:
+        with open(os.path.join(path, META_FILE)) as file:
+            meta = json.load(file)
+        if meta.get('format') != CACHE_FORMAT or meta['source'] != source_stat(filename):
+            return None
+        return TickerColumns(*[np.load(os.path.join(path, name + '.npy'), mmap_mode='c')
+                               for name in CACHE_FILES])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _replace(filename: str, write) -> None:
+    """ Writes filename through a temporary file, readers never see it half written """
+    tmp_filename = filename + '.tmp'
+    with open(tmp_filename, 'wb') as file:
+        write(file)
+    os.replace(tmp_filename, filename)
+
+
+def write_cache(filename: str, ticker: TickerColumns) -> None:
+    """ Stores the columns of the json file, failures only disable the cache """
+    path = cache_path(filename)
+    meta = {'format': CACHE_FORMAT, 'source': source_stat(filename), 'length': len(ticker)}
+    try:
+        os.makedirs(path, exist_ok=True)
+        # Without meta file the cache is invalid while the columns are replaced
+        meta_file = os.path.join(path, META_FILE)
+        if os.path.isfile(meta_file):
+            os.remove(meta_file)
+        for name in CACHE_FILES:
+            _replace(os.path.join(path, name + '.npy'),
+                     lambda file: np.save(file, np.ascontiguousarray(getattr(ticker, name))))
+        _replace(meta_file, lambda file: file.write(json.dumps(meta).encode()))
+    except OSError as error:
+        logger.warning('Could not cache the ticker data of %s: %s', filename, error)
+
+
+def load_json(filename: str) -> List[Dict]:
+    if filename.endswith('.gz'):
+        with gzip.open(filename) as tickerdata:
+            return json.load(tickerdata)
+    with open(filename) as tickerdata:
+        return json.load(tickerdata)
+
+
+def load_ticker_file(filename: str) -> Union[TickerColumns, List[Dict]]:
+    """
+    Loads a json ticker data file through its columnar cache,
+    the cache is built on the first load and whenever the file changed
+    :return: TickerColumns, memory-mapped when the cache could be written,
+             or the empty list of an empty file
+    """
+    ticker = read_cache(filename)
+    if ticker is not None:
+        return ticker
+    tickers = load_json(filename)
+    if not tickers:
+        return tickers
+    logger.debug('Caching the columns of %s in %s', filename, cache_path(filename))
+    ticker = TickerColumns.from_tickers(tickers)
+    write_cache(filename, ticker)
+    # Map the cache just written, the converted arrays are dropped
+    cached = read_cache(filename)
+    return ticker if cached is None else cached
@@ -1,4 +1,5 @@
 import logging
+from abc import ABC, abstractmethod
 from datetime import datetime
 from decimal import Decimal, getcontext
 from typing import Dict, Optional
@@ -71,6 +72,33 @@ def clean_dry_run_db() -> None:
             trade.open_order_id = None
 
 
+class ITrade(ABC):
+    """
+    Interface of the trade objects accepted by main.should_sell() and main.min_roi_reached()
+    Implemented by Trade (live bot) and optimize.backtesting.SimTrade (backtesting)
+
+    Attributes every implementation provides:
+        open_rate -> float, open_date -> datetime, amount -> float, fee -> float,
+        close_rate -> Optional[float], used by calc_profit*() when no rate is given
+    """
+    __slots__ = ()
+
+    @abstractmethod
+    def calc_profit(self, rate: Optional[float] = None, fee: Optional[float] = None) -> float:
+        """
+        Calculate the profit in BTC between Close and Open trade
+        :return: profit in BTC as float
+        """
+
+    @abstractmethod
+    def calc_profit_percent(
+            self, rate: Optional[float] = None, fee: Optional[float] = None) -> float:
+        """
+        Calculates the profit in percentage (including fee).
+        :return: profit in percentage as float
+        """
+
+
 class Trade(_DECL_BASE):
     __tablename__ = 'trades'
 
@@ -211,3 +239,7 @@ class Trade(_DECL_BASE):
         )
 
         return float("{0:.8f}".format((close_trade_price / open_trade_price) - 1))
+
+
+# Trade can not inherit from ITrade, the metaclasses of ABC and SQLAlchemy conflict
+ITrade.register(Trade)
@@ -3,6 +3,7 @@ import re
 import arrow
 from decimal import Decimal
 from datetime import datetime, timedelta
+from typing import Optional
 from pandas import DataFrame
 import sqlalchemy as sql
 # from sqlalchemy import and_, func, text
@@ -11,14 +12,25 @@ from freqtrade.persistence import Trade
 from freqtrade.misc import State, get_state, update_state
 from freqtrade import exchange
 from freqtrade.fiat_convert import CryptoToFiatConverter
-from . import telegram
 
 logger = logging.getLogger(__name__)
 
-_FIAT_CONVERT = CryptoToFiatConverter()
+# Created by fiat_converter() the first time it is used
+_FIAT_CONVERT: Optional[CryptoToFiatConverter] = None
 REGISTERED_MODULES = []
 
 
+def fiat_converter() -> CryptoToFiatConverter:
+    """
+    :return: the CryptoToFiatConverter of the rpc modules, created the first time
+             a fiat value is needed instead of when the module is imported
+    """
+    global _FIAT_CONVERT
+    if _FIAT_CONVERT is None:
+        _FIAT_CONVERT = CryptoToFiatConverter()
+    return _FIAT_CONVERT
+
+
 def init(config: dict) -> None:
     """
     Initializes all enabled rpc modules
@@ -28,6 +40,8 @@ def init(config: dict) -> None:
 
     if config['telegram'].get('enabled', False):
         logger.info('Enabling rpc.telegram ...')
+        # python-telegram-bot is only imported when telegram is enabled
+        from freqtrade.rpc import telegram
         REGISTERED_MODULES.append('telegram')
         telegram.init(config)
 
@@ -39,6 +53,7 @@ def cleanup() -> None:
     """
     if 'telegram' in REGISTERED_MODULES:
         logger.debug('Cleaning up rpc.telegram ...')
+        from freqtrade.rpc import telegram
         telegram.cleanup()
 
 
@@ -50,6 +65,7 @@ def send_msg(msg: str) -> None:
     """
     logger.info(msg)
     if 'telegram' in REGISTERED_MODULES:
+        from freqtrade.rpc import telegram
         telegram.send_msg(msg)
 
 
@@ -156,7 +172,7 @@ def rpc_daily_profit(timescale, stake_currency, fiat_display_currency):
     if not (isinstance(timescale, int) and timescale > 0):
         return (True, '*Daily [n]:* `must be an integer greater than 0`')
 
-    fiat = _FIAT_CONVERT
+    fiat = fiat_converter()
     for day in range(0, timescale):
         profitday = today - timedelta(days=day)
         trades = Trade.query \
@@ -239,7 +255,7 @@ def rpc_trade_statistics(stake_currency, fiat_display_currency) -> None:
 
     # FIX: we want to keep fiatconverter in a state/environment,
     #      doing this will utilize its caching functionallity, instead we reinitialize it here
-    fiat = _FIAT_CONVERT
+    fiat = fiat_converter()
     # Prepare data to display
     profit_closed_coin = round(sum(profit_closed_coin), 8)
     profit_closed_percent = round(sum(profit_closed_percent) * 100, 2)
@@ -303,7 +319,7 @@ def rpc_balance(fiat_display_currency):
                        'pending': currency['Pending'],
                        'est_btc': currency['BTC']
                        })
-    fiat = _FIAT_CONVERT
+    fiat = fiat_converter()
     symbol = fiat_display_currency
     value = fiat.convert_amount(total, 'BTC', symbol)
     return (False, (output, total, symbol, value))
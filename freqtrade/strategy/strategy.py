@@ -8,7 +8,9 @@ import sys
 import logging
 import importlib
 from collections import OrderedDict
+from typing import Dict, Tuple
 
+import numpy as np
 from pandas import DataFrame
 from freqtrade.strategy.interface import IStrategy
 
@@ -79,6 +81,41 @@ class Strategy(object):
 
         self.ticker_interval = self.custom_strategy.ticker_interval
 
+    @property
+    def minimal_roi(self) -> Dict[int, float]:
+        """
+        Minimal ROI designed for the strategy
+        :return: dict of duration in minutes -> ROI threshold
+        """
+        return self._minimal_roi
+
+    @minimal_roi.setter
+    def minimal_roi(self, minimal_roi: Dict[int, float]) -> None:
+        """
+        Set the minimal ROI and precompute its lookup table (see roi_lookup_arrays())
+        :param minimal_roi: dict of duration in minutes -> ROI threshold
+        :return: None
+        """
+        self._minimal_roi = minimal_roi
+        self.roi_table = self.roi_lookup_arrays(minimal_roi)
+
+    @staticmethod
+    def roi_lookup_arrays(minimal_roi: Dict[int, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Build arrays to look up the ROI threshold of a trade duration without iterating over
+        minimal_roi. min_roi_reached() walks minimal_roi in order and stops at the first
+        duration that is not yet reached, so for a trade open since `minutes`:
+            thresholds[bounds.searchsorted(minutes)] is the smallest threshold to exceed,
+            np.inf if there is none.
+        :param minimal_roi: dict of duration in minutes -> ROI threshold
+        :return: tuple containing bounds, thresholds
+        """
+        durations = np.array(list(minimal_roi.keys()), dtype=np.float64)
+        values = np.array(list(minimal_roi.values()), dtype=np.float64)
+        bounds = np.maximum.accumulate(durations) if len(durations) else durations
+        thresholds = np.concatenate(([np.inf], np.minimum.accumulate(values)))
+        return bounds, thresholds
+
     def _load_strategy(self, strategy_name: str) -> None:
         """
         Search and load the custom strategy. If no strategy found, fallback on the default strategy
@@ -178,3 +215,22 @@ class Strategy(object):
         :return: DataFrame with buy column
         """
         return self.custom_strategy.populate_sell_trend(dataframe)
+
+
+class StrategyParameters(object):
+    """
+    Sell parameters of a strategy, used instead of the Strategy singleton by
+    main.should_sell() to backtest other values without modifying the Strategy
+    """
+    __slots__ = ('minimal_roi', 'roi_table', 'stoploss')
+
+    def __init__(self, minimal_roi: Dict[int, float], stoploss: float) -> None:
+        self.minimal_roi = minimal_roi
+        self.roi_table = Strategy.roi_lookup_arrays(minimal_roi)
+        self.stoploss = stoploss
+
+    @classmethod
+    def from_strategy(cls) -> 'StrategyParameters':
+        """ :return: the current parameters of the Strategy singleton """
+        strategy = Strategy()
+        return cls(strategy.minimal_roi, strategy.stoploss)
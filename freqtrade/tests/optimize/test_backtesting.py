@@ -1,14 +1,23 @@
 # pragma pylint: disable=missing-docstring, W0212, line-too-long, C0103
+import copy
+import json
 import random
 import logging
 import math
 from unittest.mock import MagicMock
+
+import arrow
 import pandas as pd
+import pytest
 import numpy as np
 from freqtrade import exchange, optimize
 from freqtrade.exchange import Bittrex
+from freqtrade.main import should_sell
 from freqtrade.optimize import preprocess
-from freqtrade.optimize.backtesting import backtest, generate_text_table, get_timeframe
+from freqtrade.optimize.backtesting import backtest, generate_text_table, get_timeframe, \
+    SimTrade
+from freqtrade.persistence import ITrade, Trade
+from freqtrade.strategy.strategy import StrategyParameters
 import freqtrade.optimize.backtesting as backtesting
 from freqtrade.tests.conftest import log_has
 
@@ -97,10 +106,81 @@ def test_generate_text_table():
     )
     print(generate_text_table({'BTC_ETH': {}}, results, 'BTC'))
     assert generate_text_table({'BTC_ETH': {}}, results, 'BTC') == (
-        'pair       buy count    avg profit %    total profit BTC    avg duration    profit    loss\n'  # noqa
-        '-------  -----------  --------------  ------------------  --------------  --------  ------\n'  # noqa
-        'BTC_ETH            2           15.00          0.60000000            20.0         2       0\n'  # noqa
-        'TOTAL              2           15.00          0.60000000            20.0         2       0')  # noqa
+        'pair       buy count    avg profit %    total profit BTC    avg duration    profit    loss    win rate %    median duration\n'  # noqa
+        '-------  -----------  --------------  ------------------  --------------  --------  ------  ------------  -----------------\n'  # noqa
+        'BTC_ETH            2           15.00          0.60000000            20.0         2       0         100.0               20.0\n'  # noqa
+        'TOTAL              2           15.00          0.60000000            20.0         2       0         100.0               20.0')  # noqa
+
+
+def test_generate_text_table_multiple_pairs():
+    results = pd.DataFrame(
+        {
+            'currency': ['BTC_ETH', 'BTC_LTC', 'BTC_ETH'],
+            'profit_percent': [0.1, -0.1, 0.2],
+            'profit_BTC': [0.2, -0.1, 0.4],
+            'duration': [10, 40, 30],
+        }
+    )
+    data = {'BTC_ETH': {}, 'BTC_LTC': {}, 'BTC_XMR': {}}
+    rows = generate_text_table(data, results, 'BTC').splitlines()[2:]
+    assert rows[0].split() == ['BTC_ETH', '2', '15.00', '0.60000000', '20.0', '2', '0',
+                               '100.0', '20.0']
+    assert rows[1].split() == ['BTC_LTC', '1', '-10.00', '-0.10000000', '40.0', '0', '1',
+                               '0.0', '40.0']
+    assert rows[2].split() == ['BTC_XMR', '0', 'nan', '0.00000000', 'nan', '0', '0',
+                               'nan', 'nan']
+    assert rows[3].split() == ['TOTAL', '3', '6.67', '0.50000000', '26.7', '2', '1',
+                               '66.7', '30.0']
+
+    # An empty result set still yields a row per pair and a total
+    rows = generate_text_table(data, results.iloc[:0], 'BTC').splitlines()[2:]
+    assert [row.split()[:2] for row in rows] == [
+        ['BTC_ETH', '0'], ['BTC_LTC', '0'], ['BTC_XMR', '0'], ['TOTAL', '0']]
+
+
+def test_simtrade_profit_equals_trade(default_strategy, default_conf, mocker):
+    mocker.patch.dict('freqtrade.main._CONF', default_conf)
+    open_date = arrow.utcnow().shift(minutes=-35).datetime
+    for open_rate, rate in [(0.00001099, 0.00001234), (0.00001099, 0.00000123),
+                            (0.0524, 0.0544), (0.0524, 0.0412), (0.00099876, 0.0010012)]:
+        kwargs = {'open_rate': open_rate, 'open_date': open_date, 'stake_amount': 0.001,
+                  'amount': 0.001 / open_rate, 'fee': 0.0025}
+        trade = Trade(pair='BTC_ETH', **kwargs)
+        sim_trade = SimTrade(**kwargs)
+        assert isinstance(sim_trade, ITrade)
+        assert not hasattr(sim_trade, '__dict__')
+        assert isinstance(trade, ITrade)
+        assert sim_trade.calc_profit(rate) == pytest.approx(trade.calc_profit(rate), abs=1e-8)
+        assert sim_trade.calc_profit(rate, fee=0.003) == \
+            pytest.approx(trade.calc_profit(rate, fee=0.003), abs=1e-8)
+        # Trade computes with 8 significant digits, which is 1e-7 relative precision
+        # for prices just above a power of ten
+        assert sim_trade.calc_profit_percent(rate) == \
+            pytest.approx(trade.calc_profit_percent(rate), abs=1e-7)
+        for date in [arrow.utcnow().datetime, arrow.utcnow().shift(minutes=5).datetime]:
+            assert should_sell(sim_trade, rate, date, False, True) == \
+                should_sell(trade, rate, date, False, True)
+
+
+def test_simtrade_profit_falls_back_to_close_rate(default_conf, mocker):
+    mocker.patch.dict('freqtrade.main._CONF', default_conf)
+    kwargs = {'open_rate': 0.00001099, 'open_date': arrow.utcnow().datetime,
+              'stake_amount': 0.001, 'amount': 0.001 / 0.00001099, 'fee': 0.0025}
+    trade = Trade(pair='BTC_ETH', **kwargs)
+    sim_trade = SimTrade(**kwargs)
+    # Without rate and close_rate both close at 0
+    assert sim_trade.calc_close_trade_price() == trade.calc_close_trade_price() == 0.0
+    assert sim_trade.calc_profit() == pytest.approx(trade.calc_profit(), abs=1e-8)
+
+    trade.close_rate = 0.00001234
+    sim_trade = SimTrade(close_rate=0.00001234, **kwargs)
+    assert sim_trade.calc_profit() == pytest.approx(trade.calc_profit(), abs=1e-8)
+    assert sim_trade.calc_profit() == sim_trade.calc_profit(rate=0.00001234)
+    assert sim_trade.calc_profit_percent() == \
+        pytest.approx(trade.calc_profit_percent(), abs=1e-7)
+    # An explicit rate wins over close_rate
+    assert sim_trade.calc_profit(rate=0.00001099) == \
+        pytest.approx(trade.calc_profit(rate=0.00001099), abs=1e-8)
 
 
 def test_get_timeframe(default_strategy):
@@ -109,6 +189,29 @@ def test_get_timeframe(default_strategy):
     min_date, max_date = get_timeframe(data)
     assert min_date.isoformat() == '2017-11-04T23:02:00+00:00'
     assert max_date.isoformat() == '2017-11-14T22:59:00+00:00'
+    assert data.timeframe is not None
+
+
+def test_get_timeframe_multiple_pairs_cached(default_strategy, mocker):
+    data = preprocess(optimize.load_data(
+        None, ticker_interval=1, pairs=['BTC_UNITEST', 'BTC_ETH']))
+    min_date, max_date = get_timeframe(data)
+    assert min_date == arrow.get(data['BTC_UNITEST']['date'].min())
+    assert max_date == arrow.get(data['BTC_ETH']['date'].max())
+
+    # The second call uses the cached value
+    assert data.timeframe is not None
+    assert get_timeframe(data) == (min_date, max_date)
+
+    # Changing the pairs computes the timeframe again
+    data['BTC_UNITEST'] = data['BTC_UNITEST'][100:]
+    assert data.timeframe is None
+    assert get_timeframe(data)[0] == arrow.get(data['BTC_UNITEST']['date'].min()) > min_date
+    del data['BTC_ETH']
+    assert get_timeframe(data)[1] == arrow.get(data['BTC_UNITEST']['date'].max()) < max_date
+    data.update({'BTC_ETH': preprocess(optimize.load_data(
+        None, ticker_interval=1, pairs=['BTC_ETH']))['BTC_ETH']})
+    assert get_timeframe(data)[1] == max_date
 
 
 def test_backtest(default_strategy, default_conf, mocker):
@@ -138,6 +241,127 @@ def test_backtest_1min_ticker_interval(default_strategy, default_conf, mocker):
     assert not results.empty
 
 
+def test_backtest_vectorized_equals_reference(default_strategy, default_conf, mocker):
+    conf = copy.deepcopy(default_conf)
+    conf['experimental'] = {'use_sell_signal': True, 'sell_profit_only': True}
+    mocker.patch.dict('freqtrade.main._CONF', conf)
+    exchange._API = Bittrex({'key': '', 'secret': ''})
+
+    data = optimize.load_data(None, ticker_interval=1, pairs=['BTC_UNITEST', 'BTC_ETH'])
+    processed = optimize.preprocess(data)
+    for realistic, max_open_trades in [(False, 0), (True, 0), (True, 1)]:
+        backtest_conf = {'stake_amount': conf['stake_amount'],
+                         'processed': processed,
+                         'max_open_trades': max_open_trades,
+                         'realistic': realistic}
+        reference = backtest({**backtest_conf, 'vectorized': False})
+        results = backtest(backtest_conf)
+        assert not results.empty
+        assert results.equals(reference)
+
+
+def test_backtest_jobs_equals_serial(default_strategy, default_conf, mocker):
+    mocker.patch.dict('freqtrade.main._CONF', default_conf)
+    exchange._API = Bittrex({'key': '', 'secret': ''})
+
+    pairs = ['BTC_ETH', 'BTC_LTC', 'BTC_XMR']
+    data = optimize.load_data(None, ticker_interval=1, pairs=pairs)
+    backtest_conf = {'stake_amount': default_conf['stake_amount'],
+                     'processed': optimize.preprocess(data),
+                     'max_open_trades': 2,
+                     'realistic': True}
+    serial = backtest(backtest_conf)
+    results = backtest({**backtest_conf, 'jobs': 2})
+    assert len(results.currency.unique()) > 1
+    assert results.equals(serial)
+
+
+def test_backtest_precomputed_columns(default_strategy, default_conf, mocker):
+    mocker.patch.dict('freqtrade.main._CONF', default_conf)
+    exchange._API = Bittrex({'key': '', 'secret': ''})
+
+    pairs = ['BTC_ETH', 'BTC_UNITEST']
+    processed = optimize.preprocess(optimize.load_data(None, ticker_interval=1, pairs=pairs))
+    backtest_conf = {'stake_amount': default_conf['stake_amount'],
+                     'processed': processed,
+                     'max_open_trades': 2,
+                     'realistic': True}
+    columns = {pair: backtesting.get_pair_columns(pair_data)
+               for pair, pair_data in processed.items()}
+    buy_trend = MagicMock(side_effect=backtesting.populate_buy_trend)
+    for stoploss in [-0.05, -0.1]:
+        strategy = StrategyParameters(default_strategy.minimal_roi, stoploss)
+        expected = backtest({**backtest_conf, 'strategy': strategy})
+        results = backtest({**backtest_conf, 'strategy': strategy, 'columns': columns,
+                            'populate_buy_trend': buy_trend})
+        assert not results.empty
+        assert results.equals(expected)
+    assert not buy_trend.called
+    assert all('buy_indexes' in pair_columns for pair_columns in columns.values())
+
+
+def test_backtest_candidates(default_strategy, default_conf, mocker):
+    conf = copy.deepcopy(default_conf)
+    conf['experimental'] = {'use_sell_signal': True, 'sell_profit_only': True}
+    mocker.patch.dict('freqtrade.main._CONF', conf)
+    exchange._API = Bittrex({'key': '', 'secret': ''})
+
+    pairs = ['BTC_ETH', 'BTC_UNITEST']
+    processed = optimize.preprocess(optimize.load_data(None, ticker_interval=1, pairs=pairs))
+    strategies = [StrategyParameters({0: 0.05, 20: 0.02, 60: 0.0}, -0.05),
+                  StrategyParameters({0: 0.1}, None),
+                  StrategyParameters({0: 0.01, 10: 0.005}, -0.2),
+                  StrategyParameters({}, -0.02)]
+    for realistic in [False, True]:
+        backtest_conf = {'stake_amount': conf['stake_amount'],
+                         'processed': processed,
+                         'realistic': realistic}
+        results = backtesting.backtest_candidates(backtest_conf, strategies)
+        assert len(results) == len(strategies)
+        for strategy, result in zip(strategies, results):
+            assert result.equals(backtest({**backtest_conf, 'strategy': strategy}))
+        assert not results[0].empty
+
+    with pytest.raises(ValueError):
+        backtesting.backtest_candidates({**backtest_conf, 'max_open_trades': 1}, strategies)
+
+
+def test_backtest_timeline(default_strategy, default_conf, mocker):
+    mocker.patch.dict('freqtrade.main._CONF', default_conf)
+    exchange._API = Bittrex({'key': '', 'secret': ''})
+
+    pairs = ['BTC_ETH', 'BTC_LTC', 'BTC_XMR']
+    processed = optimize.preprocess(optimize.load_data(None, ticker_interval=1, pairs=pairs))
+    backtest_conf = {'stake_amount': default_conf['stake_amount'],
+                     'processed': processed,
+                     'realistic': True}
+
+    # Without slot limit the same trades are done, in time order
+    serial = backtest(backtest_conf)
+    results = backtest({**backtest_conf, 'timeline': True})
+    key = ['currency', 'profit_percent', 'duration']
+    assert results.sort_values(key).reset_index(drop=True).equals(
+        serial.sort_values(key).reset_index(drop=True))
+
+    # A single pair has no slot competition
+    single = {**backtest_conf, 'processed': {'BTC_ETH': processed['BTC_ETH']},
+              'max_open_trades': 1}
+    assert backtest({**single, 'timeline': True}).equals(backtest(single))
+
+    # Never more than max_open_trades trades open at once
+    records = []
+    writer = MagicMock()
+    writer.write = records.append
+    mocker.patch('freqtrade.misc.JsonLinesWriter', return_value=writer)
+    results = backtest({**backtest_conf, 'max_open_trades': 2, 'timeline': True,
+                        'record': 'trades'})
+    assert len(results.currency.unique()) > 1
+    spans = [(buy, sell) for (_, _, buy, sell, _, _) in records]
+    assert [buy for buy, _ in spans] == sorted(buy for buy, _ in spans)
+    for buy, _ in spans:
+        assert sum(1 for start, stop in spans if start <= buy <= stop) <= 2
+
+
 def load_data_test(what):
     timerange = ((None, 'line'), None, -100)
     data = optimize.load_data(None, ticker_interval=1, pairs=['BTC_UNITEST'], timerange=timerange)
@@ -246,8 +470,10 @@ def test_backtest_record(default_conf, mocker, default_strategy):
     names = []
     records = []
     mocker.patch.dict('freqtrade.main._CONF', default_conf)
-    mocker.patch('freqtrade.misc.file_dump_json',
-                 new=lambda n, r: (names.append(n), records.append(r)))
+    writer = MagicMock()
+    writer.write = records.append
+    mocker.patch('freqtrade.misc.JsonLinesWriter',
+                 new=lambda name: names.append(name) or writer)
     backtest_conf = _make_backtest_conf(
         conf=default_conf,
         pair='BTC_UNITEST',
@@ -256,25 +482,42 @@ def test_backtest_record(default_conf, mocker, default_strategy):
     results = _run_backtest_1(default_strategy, _trend_alternate,
                               backtest_conf)
     assert len(results) == 3
-    # Assert file_dump_json was only called once
-    assert names == ['backtest-result.json']
-    records = records[0]
+    # Assert the writer was only opened once, and closed
+    assert names == ['backtest-result.jsonl']
+    assert writer.close.call_count == 1
     # Ensure records are of correct type
     assert len(records) == 3
-    # ('BTC_UNITEST', 0.00331158, '1510684320', '1510691700', 0, 117)
+    # ['BTC_UNITEST', 0.00331158, 1510684320, 1510691700, 0, 117]
     # Below follows just a typecheck of the schema/type of trade-records
     oix = None
     for (pair, profit, date_buy, date_sell, buy_index, dur) in records:
         assert pair == 'BTC_UNITEST'
-        isinstance(profit, float)
-        # FIX: buy/sell should be converted to ints
-        isinstance(date_buy, str)
-        isinstance(date_sell, str)
-        isinstance(buy_index, pd._libs.tslib.Timestamp)
+        assert isinstance(profit, float)
+        assert isinstance(date_buy, int)
+        assert isinstance(date_sell, int)
+        assert date_sell > date_buy
+        assert isinstance(buy_index, int)
         if oix:
             assert buy_index > oix
         oix = buy_index
         assert dur > 0
+    assert json.loads(json.dumps(records)) == records
+
+
+def test_backtest_record_file(default_conf, mocker, default_strategy, tmpdir):
+    mocker.patch.dict('freqtrade.main._CONF', default_conf)
+    filename = str(tmpdir.join('backtest-result.jsonl'))
+    mocker.patch('freqtrade.optimize.backtesting.EXPORT_FILENAME', filename)
+    backtest_conf = _make_backtest_conf(
+        conf=default_conf,
+        pair='BTC_UNITEST',
+        record="trades"
+    )
+    results = _run_backtest_1(default_strategy, _trend_alternate,
+                              backtest_conf)
+    with open(filename) as file:
+        records = [json.loads(line) for line in file]
+    assert [record[1] for record in records] == list(results.profit_percent)
 
 
 def test_processed(default_conf, mocker, default_strategy):
@@ -296,7 +539,52 @@ def test_backtest_pricecontours(default_conf, mocker, default_strategy):
         simple_backtest(default_conf, contour, numres)
 
 
-def mocked_load_data(datadir, pairs=[], ticker_interval=0, refresh_pairs=False, timerange=None):
+def _sine_ticks(count):
+    start = arrow.get('2017-11-01T00:00:00')
+    return [{'T': start.shift(minutes=x).format('YYYY-MM-DDTHH:mm:ss'),
+             'V': 1.0,
+             'O': math.sin(x * 0.1) / 1000 + 0.001,
+             'H': math.sin(x * 0.1) / 1000 + 0.0011,
+             'L': math.sin(x * 0.1) / 1000 + 0.0009,
+             'C': math.sin(x * 0.1) / 1000 + 0.001} for x in range(count)]
+
+
+def test_backtest_scales_linearly(default_conf, mocker, default_strategy):
+    """
+    The work per trade must not grow with the candle count,
+    scripts/benchmark_backtest.py measures the time per candle
+    """
+    mocker.patch.dict('freqtrade.main._CONF', default_conf)
+    sell_checks = mocker.patch('freqtrade.optimize.backtesting.should_sell',
+                               side_effect=should_sell)
+    scanned_rows = []
+
+    def get_sell_candidates_batch(index, start, stop, *args):
+        scanned_rows.append(stop - start)
+        return get_candidates(index, start, stop, *args)
+    get_candidates = backtesting.get_sell_candidates_batch
+    mocker.patch('freqtrade.optimize.backtesting.get_sell_candidates_batch',
+                 side_effect=get_sell_candidates_batch)
+
+    def work_per_trade(count):
+        sell_checks.reset_mock()
+        scanned_rows.clear()
+        backtest_conf = {'stake_amount': default_conf['stake_amount'],
+                         'processed': optimize.preprocess({'BTC_UNITEST': _sine_ticks(count)}),
+                         'realistic': False}
+        results = _run_backtest_1(default_strategy, _trend_alternate, backtest_conf)
+        assert len(results) >= count // 3
+        return sell_checks.call_count / len(results), sum(scanned_rows) / len(results)
+
+    small_checks, small_rows = work_per_trade(500)
+    large_checks, large_rows = work_per_trade(4000)
+    # a quadratic simulation would check and scan 8x more rows per trade
+    assert large_checks <= small_checks * 1.5
+    assert large_rows <= small_rows * 1.5
+
+
+def mocked_load_data(datadir, pairs=[], ticker_interval=0, refresh_pairs=False, timerange=None,
+                     jobs=1):
     tickerdata = optimize.load_tickerdata_file(datadir, 'BTC_UNITEST', 1, timerange=timerange)
     pairdata = {'BTC_UNITEST': tickerdata}
     return pairdata
@@ -315,6 +603,9 @@ def test_backtest_start(default_conf, mocker, caplog):
     args.live = False
     args.datadir = None
     args.export = None
+    args.jobs = 1
+    args.timeline = False
+    args.profile = None
     args.timerange = '-100'  # needed due to MagicMock malleability
     backtesting.start(args)
     # check the logs, that will contain the backtest result
@@ -339,6 +630,9 @@ def test_backtest_start_live(default_strategy, default_conf, mocker, caplog):
     args.live = True
     args.datadir = None
     args.export = None
+    args.jobs = 1
+    args.timeline = False
+    args.profile = None
     args.timerange = '-100'  # needed due to MagicMock malleability
     backtesting.start(args)
     # check the logs, that will contain the backtest result
@@ -1,14 +1,22 @@
 # pragma pylint: disable=missing-docstring,W0212,C0103
+import json
 import logging
 
 from unittest.mock import MagicMock
 
 import pandas as pd
+from hyperopt import STATUS_OK, base, space_eval
+
+from freqtrade import optimize
 
 from freqtrade.optimize.hyperopt import calculate_loss, TARGET_TRADES, EXPECTED_MAX_PROFIT, start, \
-    log_results, save_trials, read_trials, generate_roi_table, has_space
+    generate_roi_table, has_space, buy_strategy_generator, BuySignalCache, HyperoptRunner, \
+    TrialJournal, TRIGGERS, HALVING_ETA, slice_processed, HyperoptProgress, run_options
+from freqtrade.strategy.strategy import Strategy, StrategyParameters
+from freqtrade.analyze import parse_ticker_dataframe
 
 import freqtrade.optimize.hyperopt as hyperopt
+from freqtrade.optimize import backtesting
 
 
 def test_loss_calculation_prefer_correct_trade_count():
@@ -36,34 +44,35 @@ def test_loss_calculation_has_limited_profit():
 def create_trials(mocker):
     """
     When creating trials, mock the hyperopt Trials so that *by default*
-      - we don't create any pickle'd files in the filesystem
-      - we might have a pickle'd file so make sure that we return
+      - we don't create any journal files in the filesystem
+      - we might have a journal file so make sure that we return
         false when looking for it
     """
-    mocker.patch('freqtrade.optimize.hyperopt.TRIALS_FILE',
-                 return_value='freqtrade/tests/optimize/ut_trials.pickle')
     mocker.patch('freqtrade.optimize.hyperopt.os.path.exists',
                  return_value=False)
-    mocker.patch('freqtrade.optimize.hyperopt.save_trials',
+    mocker.patch('freqtrade.optimize.hyperopt.TrialJournal.append',
                  return_value=None)
-    mocker.patch('freqtrade.optimize.hyperopt.read_trials',
+    mocker.patch('freqtrade.optimize.hyperopt.TrialJournal.read_trials',
                  return_value=None)
-    mocker.patch('freqtrade.optimize.hyperopt.os.remove',
-                 return_value=True)
     return mocker.Mock(
         results=[{
             'loss': 1,
             'result': 'foo',
             'status': 'ok'
         }],
-        best_trial={'misc': {'vals': {'adx': 999}}}
+        best_trial={'misc': {'vals': {'adx': 999}}},
+        trials=[]
     )
 
 
+def create_runner(processed=None, spaces=None):
+    return HyperoptRunner(processed or {}, spaces or ['all'], {},
+                          strategy=StrategyParameters({0: 0.1}, -0.1))
+
+
 def test_start_calls_fmin(mocker):
     trials = create_trials(mocker)
     mocker.patch('freqtrade.optimize.tickerdata_to_dataframe')
-    mocker.patch('freqtrade.optimize.hyperopt.TRIALS', return_value=trials)
     mocker.patch('freqtrade.optimize.hyperopt.sorted',
                  return_value=trials.results)
     mocker.patch('freqtrade.optimize.preprocess')
@@ -71,7 +80,9 @@ def test_start_calls_fmin(mocker):
     mock_fmin = mocker.patch('freqtrade.optimize.hyperopt.fmin', return_value={})
 
     args = mocker.Mock(epochs=1, config='config.json.example', mongodb=False,
-                       timerange=None, spaces='all')
+                       timerange=None, spaces='all', profile=None, jobs=1,
+                       halving=0, batch=1,
+                       progress=0)
     start(args)
 
     mock_fmin.assert_called_once()
@@ -85,17 +96,35 @@ def test_start_uses_mongotrials(mocker):
     mocker.patch('freqtrade.optimize.hyperopt.fmin', return_value={})
 
     args = mocker.Mock(epochs=1, config='config.json.example', mongodb=True,
-                       timerange=None, spaces='all')
+                       timerange=None, spaces='all', profile=None, jobs=1,
+                       halving=0, batch=1,
+                       progress=0)
     start(args)
 
     mock_mongotrials.assert_called_once()
 
 
+def test_run_options(mocker, caplog):
+    caplog.set_level(logging.INFO)
+    args = mocker.Mock(mongodb=False, jobs=4, halving=3, batch=50)
+    assert run_options(args) == (4, 3, 50)
+    assert 'Using 4 processes ...' in caplog.text
+    assert 'Using successive halving over 3 rungs ...' in caplog.text
+
+    args = mocker.Mock(mongodb=False, jobs=1, halving=0, batch=50)
+    assert run_options(args) == (1, 0, 50)
+    assert 'Evaluating 50 epochs at a time ...' in caplog.text
+
+    # The mongodb workers ignore the local options
+    args = mocker.Mock(mongodb=True, jobs=4, halving=3, batch=50)
+    assert run_options(args) == (1, 0, 1)
+
+
 def test_log_results_if_loss_improves(mocker):
     logger = mocker.patch('freqtrade.optimize.hyperopt.logger.info')
-    global CURRENT_BEST_LOSS
-    CURRENT_BEST_LOSS = 2
-    log_results({
+    runner = create_runner()
+    runner.current_best_loss = 2
+    runner.log_results({
         'loss': 1,
         'current_tries': 1,
         'total_tries': 2,
@@ -103,17 +132,19 @@ def test_log_results_if_loss_improves(mocker):
     })
 
     logger.assert_called_once()
+    assert runner.current_best_loss == 1
 
 
 def test_no_log_if_loss_does_not_improve(mocker):
     logger = mocker.patch('freqtrade.optimize.hyperopt.logger.info')
-    global CURRENT_BEST_LOSS
-    CURRENT_BEST_LOSS = 2
-    log_results({
+    runner = create_runner()
+    runner.current_best_loss = 2
+    runner.log_results({
         'loss': 3,
     })
 
     assert not logger.called
+    assert runner.current_best_loss == 2
 
 
 def test_fmin_best_results(mocker, caplog):
@@ -148,7 +179,9 @@ def test_fmin_best_results(mocker, caplog):
     mocker.patch('freqtrade.optimize.hyperopt.fmin', return_value=fmin_result)
 
     args = mocker.Mock(epochs=1, config='config.json.example',
-                       timerange=None, spaces='all')
+                       timerange=None, spaces='all', profile=None, jobs=1,
+                       halving=0, batch=1,
+                       progress=0)
     start(args)
 
     exists = [
@@ -172,7 +205,9 @@ def test_fmin_throw_value_error(mocker, caplog):
     mocker.patch('freqtrade.optimize.hyperopt.fmin', side_effect=ValueError())
 
     args = mocker.Mock(epochs=1, config='config.json.example',
-                       timerange=None, spaces='all')
+                       timerange=None, spaces='all', profile=None, jobs=1,
+                       halving=0, batch=1,
+                       progress=0)
     start(args)
 
     exists = [
@@ -185,66 +220,87 @@ def test_fmin_throw_value_error(mocker, caplog):
         assert line in caplog.text
 
 
-def test_resuming_previous_hyperopt_results_succeeds(mocker):
-    import freqtrade.optimize.hyperopt as hyperopt
+def test_resuming_previous_hyperopt_results_succeeds(mocker, caplog):
+    caplog.set_level(logging.INFO)
     trials = create_trials(mocker)
-    mocker.patch('freqtrade.optimize.hyperopt.TRIALS',
-                 return_value=trials)
     mocker.patch('freqtrade.optimize.hyperopt.os.path.exists',
                  return_value=True)
     mocker.patch('freqtrade.optimize.hyperopt.len',
                  return_value=len(trials.results))
-    mock_read = mocker.patch('freqtrade.optimize.hyperopt.read_trials',
+    mock_read = mocker.patch('freqtrade.optimize.hyperopt.TrialJournal.read_trials',
                              return_value=trials)
-    mock_save = mocker.patch('freqtrade.optimize.hyperopt.save_trials',
-                             return_value=None)
+    mock_close = mocker.patch('freqtrade.optimize.hyperopt.TrialJournal.close')
     mocker.patch('freqtrade.optimize.hyperopt.sorted',
                  return_value=trials.results)
     mocker.patch('freqtrade.optimize.preprocess')
     mocker.patch('freqtrade.optimize.load_data')
-    mocker.patch('freqtrade.optimize.hyperopt.fmin',
-                 return_value={})
+    mock_fmin = mocker.patch('freqtrade.optimize.hyperopt.fmin',
+                             return_value={})
     args = mocker.Mock(epochs=1,
                        config='config.json.example',
                        mongodb=False,
                        timerange=None,
+                       profile=None,
+                       jobs=1,
+                       halving=0,
+                       batch=1,
+                       progress=0,
                        spaces='all')
 
     start(args)
 
     mock_read.assert_called_once()
-    mock_save.assert_called_once()
-
-    current_tries = hyperopt._CURRENT_TRIES
-    total_tries = hyperopt.TOTAL_TRIES
-
-    assert current_tries == len(trials.results)
-    assert total_tries == (current_tries + len(trials.results))
-
-
-def test_save_trials_saves_trials(mocker):
-    trials = create_trials(mocker)
-    mock_dump = mocker.patch('freqtrade.optimize.hyperopt.pickle.dump',
-                             return_value=None)
-    trials_path = mocker.patch('freqtrade.optimize.hyperopt.TRIALS_FILE',
-                               return_value='ut_trials.pickle')
-    mocker.patch('freqtrade.optimize.hyperopt.open',
-                 return_value=trials_path)
-    save_trials(trials, trials_path)
-
-    mock_dump.assert_called_once_with(trials, trials_path)
-
-
-def test_read_trials_returns_trials_file(mocker):
-    trials = create_trials(mocker)
-    mock_load = mocker.patch('freqtrade.optimize.hyperopt.pickle.load',
-                             return_value=trials)
-    mock_open = mocker.patch('freqtrade.optimize.hyperopt.open',
-                             return_value=mock_load)
-
-    assert read_trials() == trials
-    mock_open.assert_called_once()
-    mock_load.assert_called_once()
+    mock_close.assert_called_once()
+
+    assert 'Continuing with trials. Current: 1, Total: 2' in caplog.text
+    assert mock_fmin.call_args[1]['trials'] is trials
+    assert mock_fmin.call_args[1]['max_evals'] == len(trials.results) + args.epochs
+
+
+def test_trial_journal(default_strategy, default_conf, mocker, tmpdir):
+    mocker.patch.dict('freqtrade.main._CONF', default_conf)
+    data = optimize.load_data(None, ticker_interval=1, pairs=['BTC_UNITEST'])
+    processed = optimize.preprocess(data)
+    filename = str(tmpdir.join('trials.jsonl'))
+    journal = TrialJournal(filename)
+    runner = HyperoptRunner(processed, ['roi', 'stoploss'], default_conf, journal=journal)
+    runner.run(4)
+    # every evaluation is on disk before the journal is closed
+    records = list(TrialJournal(filename).records())
+    assert [record['loss'] for record in records] == runner.trials.losses()
+    journal.close()
+
+    # a process killed while writing leaves an incomplete last line behind
+    with open(filename, 'a') as file:
+        file.write('{"loss": 0.1, "sta')
+
+    trials = TrialJournal(filename).read_trials()
+    assert trials.losses() == runner.trials.losses()
+    assert [trial['misc']['vals'] for trial in trials.trials] == \
+        [trial['misc']['vals'] for trial in runner.trials.trials]
+
+    resumed = HyperoptRunner(processed, ['roi', 'stoploss'], default_conf,
+                             journal=TrialJournal(filename))
+    resumed.resume(trials)
+    assert resumed.current_tries == 4
+    # the journaled evaluations are cached again
+    for record in records:
+        assert resumed.cached_evaluation(record['params'])['loss'] == record['loss']
+    assert resumed.cache_hits == 4
+    resumed.run(2)
+    resumed.journal.close()
+    assert len(resumed.trials.trials) == 6
+    assert [trial['tid'] for trial in resumed.trials.trials] == list(range(6))
+
+    records = list(TrialJournal(filename).records())
+    assert len(records) == 6
+    ok_records = sorted((record for record in records if record['status'] == STATUS_OK),
+                        key=lambda record: record['loss'])
+    best = TrialJournal(filename).best(2)
+    assert best == ok_records[:2]
+    if best:
+        assert set(best[0]['params']) == {'roi_t1', 'roi_t2', 'roi_t3', 'roi_p1',
+                                          'roi_p2', 'roi_p3', 'stoploss'}
 
 
 def test_roi_table_generation():
@@ -276,10 +332,12 @@ def test_format_results():
 def test_signal_handler(mocker):
     m = MagicMock()
     mocker.patch('sys.exit', m)
-    mocker.patch('freqtrade.optimize.hyperopt.save_trials', m)
     mocker.patch('freqtrade.optimize.hyperopt.log_trials_result', m)
-    hyperopt.signal_handler(9, None)
-    assert m.call_count == 3
+    runner = create_runner()
+    runner.journal = MagicMock()
+    runner.signal_handler(9, None)
+    assert m.call_count == 2
+    runner.journal.close.assert_called_once()
 
 
 def test_has_space():
@@ -287,3 +345,231 @@ def test_has_space():
     assert has_space(['buy', 'roi'], 'buy')
     assert not has_space(['buy', 'roi'], 'stoploss')
     assert has_space(['all'], 'buy')
+
+
+def test_runner_run_parallel(default_strategy, default_conf, mocker, tmpdir):
+    mocker.patch.dict('freqtrade.main._CONF', default_conf)
+    data = optimize.load_data(None, ticker_interval=1, pairs=['BTC_UNITEST'])
+    journal = TrialJournal(str(tmpdir.join('trials.jsonl')))
+    runner = HyperoptRunner(optimize.preprocess(data), ['roi', 'stoploss'], default_conf,
+                            journal=journal)
+
+    best = runner.run(5, jobs=2)
+    journal.close()
+
+    trials = runner.trials
+    assert len(trials.trials) == 5
+    assert all(trial['state'] == base.JOB_STATE_DONE for trial in trials.trials)
+    assert best == trials.argmin
+    assert runner.current_tries == sum(
+        1 for trial in trials.trials if trial['result']['status'] == STATUS_OK)
+    # The workers backtest exactly like the serial optimizer
+    space = runner.space()
+    for trial in trials.trials:
+        params = space_eval(space, base.spec_from_misc(trial['misc']))
+        assert runner.evaluate(params) == trial['result']
+    assert [record['loss'] for record in journal.records()] == trials.losses()
+    assert runner.cache_hits + runner.cache_misses == 5
+    assert runner.cache_misses == len(runner.evaluations)
+
+
+def test_slice_processed():
+    data = optimize.load_data(None, ticker_interval=1, pairs=['BTC_UNITEST'])
+    processed = optimize.preprocess(data)
+    dataframe = processed['BTC_UNITEST']
+
+    sliced = slice_processed(processed, 0.25)['BTC_UNITEST']
+    # The timeframe cached by get_timeframe() is reused
+    assert processed.timeframe is not None
+    start_date = dataframe['date'].max() - (dataframe['date'].max() -
+                                            dataframe['date'].min()) * 0.25
+    assert sliced['date'].equals(
+        dataframe.loc[dataframe['date'] >= start_date, 'date'].reset_index(drop=True))
+    assert sliced['date'].iloc[-1] == dataframe['date'].iloc[-1]
+    assert slice_processed(processed, 1.0)['BTC_UNITEST'].equals(dataframe)
+
+
+def test_runner_successive_halving(mocker):
+    runner = create_runner(spaces=['stoploss'])
+    calls = []
+
+    def evaluate(batch, fraction):
+        calls.append([fraction] * len(batch))
+        return [{'loss': -params['stoploss'] / fraction, 'status': STATUS_OK, 'result': 'foo'}
+                if params['stoploss'] < -0.05 else {'loss': float('inf'), 'status': 'fail'}
+                for params in batch]
+
+    params = [{'stoploss': round(-0.02 * i, 2)} for i in range(1, 10)]
+    evaluations = runner.successive_halving(params, 3, evaluate)
+
+    assert calls == [[1 / HALVING_ETA ** 2] * 9, [1 / HALVING_ETA] * 2, [1.0]]
+    assert evaluations[2] == {'loss': 0.06, 'status': STATUS_OK, 'result': 'foo'}
+    assert [evaluation['status'] for evaluation in evaluations] == \
+        ['fail'] * 2 + [STATUS_OK] + ['fail'] * 6
+    assert evaluations[3]['result'].startswith('Pruned on 33.3% of the timeframe: foo')
+    assert evaluations[0] == {'loss': float('inf'), 'status': 'fail'}
+
+
+def test_runner_run_halving(default_strategy, default_conf, mocker):
+    mocker.patch.dict('freqtrade.main._CONF', default_conf)
+    data = optimize.load_data(None, ticker_interval=1, pairs=['BTC_UNITEST'])
+    runner = HyperoptRunner(optimize.preprocess(data), ['roi', 'stoploss'], default_conf)
+    halving = mocker.spy(runner, 'successive_halving')
+
+    best = runner.run(5, halving=2)
+
+    trials = runner.trials
+    assert len(trials.trials) == 5
+    assert best == trials.argmin
+    assert [len(call[0][0]) for call in halving.call_args_list] == [3, 2]
+    assert set(runner.slices) == {1.0, 1 / HALVING_ETA}
+
+
+def test_runner_evaluate_batch(default_strategy, default_conf, mocker):
+    mocker.patch.dict('freqtrade.main._CONF', default_conf)
+    data = optimize.load_data(None, ticker_interval=1, pairs=['BTC_UNITEST'])
+    runner = HyperoptRunner(optimize.preprocess(data), ['roi', 'stoploss'], default_conf,
+                            realistic_simulation=True)
+    params = [{'roi_t1': 60, 'roi_t2': 30, 'roi_t3': 20, 'roi_p1': 0.01 * i,
+               'roi_p2': 0.01, 'roi_p3': 0.02, 'stoploss': -0.02 * i} for i in range(1, 6)]
+    backtest = mocker.spy(hyperopt, 'backtest')
+
+    evaluations = runner.evaluate_batch(params)
+    assert not backtest.called
+    assert evaluations == [runner.evaluate(param) for param in params]
+
+    best = runner.run(6, batch=3)
+    assert best == runner.trials.argmin
+    assert len(runner.trials.trials) == 6
+
+
+def test_hyperopt_progress(mocker, tmpdir):
+    filename = str(tmpdir.join('status.json'))
+    progress = HyperoptProgress(interval=4, filename=filename)
+    progress.begin(10)
+    assert progress.statistics()['eta'] is None
+
+    assert [progress.epochs_done() for _ in range(3)] == [False, False, False]
+    assert progress.epochs_done(2)
+    assert not progress.epochs_done(2)
+    assert progress.epochs_done(2)
+    progress.suggested(3, 0.5)
+    with progress.phase('backtest'):
+        pass
+
+    stats = progress.statistics()
+    assert stats['epochs'] == 9
+    assert stats['total_epochs'] == 10
+    assert stats['suggestions_per_sec'] == 6.0
+    assert stats['phases']['suggest'] == 0.5
+    assert stats['phases']['backtest'] > 0
+    assert stats['epoch_p95'] >= stats['epoch_mean'] >= 0
+    assert stats['eta'] >= 0
+
+    logger = mocker.patch('freqtrade.optimize.hyperopt.logger.info')
+    progress.report({'best_loss': 1.5})
+    assert logger.call_args[0][0].startswith('9/10 epochs.')
+    with open(filename) as file:
+        status = json.load(file)
+    assert status['best_loss'] == 1.5
+    assert status['epochs'] == 9
+
+
+def test_runner_run_reports_progress(default_strategy, default_conf, mocker, tmpdir):
+    mocker.patch.dict('freqtrade.main._CONF', default_conf)
+    data = optimize.load_data(None, ticker_interval=1, pairs=['BTC_UNITEST'])
+    filename = str(tmpdir.join('status.json'))
+    runner = HyperoptRunner(optimize.preprocess(data), ['roi', 'stoploss'], default_conf,
+                            progress=HyperoptProgress(interval=2, filename=filename))
+    report = mocker.spy(runner.progress, 'report')
+
+    runner.run(5)
+
+    assert report.call_count == 2
+    with open(filename) as file:
+        status = json.load(file)
+    assert status['epochs'] == 4
+    assert status['total_tries'] == 5
+    assert status['phases']['backtest'] > 0
+    assert runner.progress.suggestions == 5
+
+
+def test_runner_evaluate_cached(mocker):
+    runner = create_runner(spaces=['roi'])
+    evaluate = mocker.patch.object(runner, 'evaluate',
+                                   return_value={'loss': 1.5, 'status': STATUS_OK, 'result': 'foo'})
+    params = {'roi_t1': 60.0, 'roi_p1': 0.01}
+
+    assert runner.evaluate_cached(params) == evaluate.return_value
+    assert runner.evaluate_cached({'roi_p1': 0.01, 'roi_t1': 60.0}) == evaluate.return_value
+    runner.evaluate_cached({'roi_t1': 60.0, 'roi_p1': 0.02})
+
+    assert evaluate.call_count == 2
+    assert (runner.cache_hits, runner.cache_misses) == (1, 2)
+
+
+def test_runner_leaves_strategy_untouched(default_strategy, default_conf, mocker):
+    mocker.patch.dict('freqtrade.main._CONF', default_conf)
+    data = optimize.load_data(None, ticker_interval=1, pairs=['BTC_UNITEST'])
+    processed = optimize.preprocess(data, hyperopt.populate_indicators)
+    minimal_roi, stoploss = default_strategy.minimal_roi, default_strategy.stoploss
+    populate_buy_trend = backtesting.populate_buy_trend
+
+    buy_runner = HyperoptRunner(processed, ['buy'], default_conf)
+    roi_runner = HyperoptRunner(processed, ['roi', 'stoploss'], default_conf)
+    buy_params = {'trigger': {'type': 'lower_bb'}, 'rsi': {'enabled': True, 'value': 40.0}}
+    roi_params = {'roi_t1': 60, 'roi_t2': 30, 'roi_t3': 20,
+                  'roi_p1': 0.01, 'roi_p2': 0.01, 'roi_p3': 0.02, 'stoploss': -0.05}
+    buy_args = buy_runner.backtest_args(buy_params)
+    roi_args = roi_runner.backtest_args(roi_params)
+    assert buy_args['strategy'].minimal_roi == minimal_roi
+    assert buy_args['strategy'].stoploss == stoploss
+    assert roi_args['strategy'].minimal_roi == generate_roi_table(roi_params)
+    assert roi_args['strategy'].stoploss == -0.05
+    assert 'populate_buy_trend' not in roi_args
+    buy_runner.evaluate(buy_params)
+    roi_runner.evaluate(roi_params)
+
+    strategy = Strategy()
+    assert strategy.minimal_roi == minimal_roi
+    assert strategy.stoploss == stoploss
+    assert backtesting.populate_buy_trend is populate_buy_trend
+
+
+def test_runner_reuses_signals_without_buy_space(default_strategy, default_conf, mocker):
+    mocker.patch.dict('freqtrade.main._CONF', default_conf)
+    data = optimize.load_data(None, ticker_interval=1, pairs=['BTC_UNITEST'])
+    runner = HyperoptRunner(optimize.preprocess(data), ['roi', 'stoploss'], default_conf)
+    get_pair_columns = mocker.spy(backtesting, 'get_pair_columns')
+    params = {'roi_t1': 60, 'roi_t2': 30, 'roi_t3': 20,
+              'roi_p1': 0.01, 'roi_p2': 0.01, 'roi_p3': 0.02, 'stoploss': -0.05}
+
+    evaluation = runner.evaluate(params)
+    runner.evaluate({**params, 'stoploss': -0.1})
+    assert runner.evaluate(params) == evaluation
+    assert get_pair_columns.call_count == 1
+
+    # the buy space changes the signals every epoch
+    buy_runner = HyperoptRunner(runner.processed, ['buy'], default_conf)
+    assert 'columns' not in buy_runner.backtest_args({'trigger': {'type': 'lower_bb'}})
+
+
+def test_buy_strategy_generator_cache():
+    data = optimize.load_data(None, ticker_interval=1, pairs=['BTC_UNITEST'])
+    dataframe = hyperopt.populate_indicators(parse_ticker_dataframe(data['BTC_UNITEST']))
+    cache = BuySignalCache()
+    for i, trigger in enumerate(TRIGGERS):
+        params = {
+            'trigger': {'type': trigger},
+            'uptrend_sma': {'enabled': i % 2 == 0},
+            'green_candle': {'enabled': i % 3 == 0},
+            'rsi': {'enabled': i % 2 == 1, 'value': 20.0 + 5 * (i % 5)},
+            'adx': {'enabled': i % 4 == 0, 'value': 25.0},
+            'mfi': {'enabled': False},
+        }
+        dataframe['buy'] = 0
+        expected = buy_strategy_generator(params)(dataframe)['buy'].copy()
+        for _ in range(2):
+            dataframe['buy'] = 0
+            assert buy_strategy_generator(params, cache)(dataframe)['buy'].equals(expected)
+    assert dataframe['buy'].sum() > 0
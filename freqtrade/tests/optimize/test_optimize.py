@@ -7,8 +7,9 @@ import uuid
 from shutil import copyfile
 from freqtrade import exchange, optimize
 from freqtrade.exchange import Bittrex
-from freqtrade.optimize.__init__ import make_testdata_path, download_pairs,\
-    download_backtesting_testdata, load_tickerdata_file, trim_tickerlist, file_dump_json
+from freqtrade.optimize.__init__ import (make_testdata_path, download_pairs,
+                                         download_backtesting_testdata, load_tickerdata_file,
+                                         trim_tickerlist, file_dump_json, load_tickerdata_meta)
 from freqtrade.tests.conftest import log_has
 
 # Change this if modifying BTC_UNITEST testdatafile
@@ -37,9 +38,10 @@ def _clean_test_file(file: str) -> None:
     :return: None
     """
     file_swp = file + '.swp'
-    # 1. Delete file from the test
-    if os.path.isfile(file):
-        os.remove(file)
+    # 1. Delete file from the test, and the metadata of a downloaded file
+    for test_file in [file, file + '.meta']:
+        if os.path.isfile(test_file):
+            os.remove(test_file)
 
     # 2. Rollback to the initial file
     if os.path.isfile(file_swp):
@@ -193,12 +195,57 @@ def test_download_backtesting_testdata(default_conf, ticker_history, mocker):
 
 def test_download_backtesting_testdata2(mocker):
     tick = [{'T': 'bar'}, {'T': 'foo'}]
-    mocker.patch('freqtrade.misc.file_dump_json', return_value=None)
+    mocker.patch('freqtrade.optimize.__init__.dump_tickerdata_file', return_value=None)
     mocker.patch('freqtrade.optimize.__init__.get_ticker_history', return_value=tick)
     assert download_backtesting_testdata(None, pair="BTC-UNITEST", interval=1)
     assert download_backtesting_testdata(None, pair="BTC-UNITEST", interval=3)
 
 
+def test_download_backtesting_testdata_append(ticker_history, mocker, tmpdir):
+    get_history = mocker.patch('freqtrade.optimize.__init__.get_ticker_history',
+                               return_value=ticker_history[:2])
+    datadir = str(tmpdir)
+    filename = os.path.join(datadir, 'BTC_XEL-5.json')
+
+    download_backtesting_testdata(datadir, pair='BTC-XEL', interval=5)
+    assert load_tickerdata_meta(filename)['count'] == 2
+
+    # Only the candles newer than the last stored one are appended
+    get_history.return_value = [ticker_history[2], ticker_history[1]]
+    load_json = mocker.spy(json, 'load')
+    download_backtesting_testdata(datadir, pair='BTC-XEL', interval=5)
+    assert load_json.call_count == 1  # the metadata, not the ticker data
+    with open(filename) as file:
+        assert json.load(file) == ticker_history
+    meta = load_tickerdata_meta(filename)
+    assert meta['count'] == 3
+    assert meta['last'] == ticker_history[2]['T']
+
+    # Without new candles the file is left unchanged
+    mtime = os.stat(filename).st_mtime_ns
+    download_backtesting_testdata(datadir, pair='BTC-XEL', interval=5)
+    assert os.stat(filename).st_mtime_ns == mtime
+    assert not os.path.isfile(filename + '.tmp')
+
+
+def test_download_backtesting_testdata_merge(ticker_history, mocker, tmpdir):
+    mocker.patch('freqtrade.optimize.__init__.get_ticker_history',
+                 return_value=[ticker_history[2], ticker_history[0]])
+    datadir = str(tmpdir)
+    filename = os.path.join(datadir, 'BTC_XEL-5.json')
+    # A file without metadata is merged by date
+    file_dump_json(filename, ticker_history[:2])
+
+    download_backtesting_testdata(datadir, pair='BTC-XEL', interval=5)
+    with open(filename) as file:
+        assert json.load(file) == ticker_history
+    assert load_tickerdata_meta(filename)['count'] == 3
+
+    # The metadata of a file changed by another tool are ignored
+    file_dump_json(filename, ticker_history[:1])
+    assert load_tickerdata_meta(filename) is None
+
+
 def test_load_tickerdata_file():
     # 7 does not exist in either format.
     assert not load_tickerdata_file(None, 'BTC_UNITEST', 7)
@@ -225,6 +272,35 @@ def test_tickerdata_to_dataframe():
     assert len(data['BTC_UNITEST']) == 100
 
 
+def test_load_data_parallel(default_conf, ticker_history, mocker, caplog):
+    caplog.set_level(logging.INFO)
+    mocker.patch('freqtrade.optimize.get_ticker_history', return_value=ticker_history)
+    mocker.patch.dict('freqtrade.main._CONF', default_conf)
+
+    exchange._API = Bittrex({'key': '', 'secret': ''})
+
+    file = 'freqtrade/tests/testdata/BTC_MEME-1.json'
+    _backup_file(file)
+    pairs = ['BTC_UNITEST', 'BTC_MEME', 'BTC_ETH']
+    data = optimize.load_data(None, ticker_interval=1, pairs=pairs, jobs=3)
+    assert list(data.keys()) == pairs
+    assert len(data['BTC_UNITEST']) == _BTC_UNITTEST_LENGTH
+    assert len(data['BTC_ETH']) == len(load_tickerdata_file(None, 'BTC_ETH', 1))
+    assert log_has('Download the pair: "BTC_MEME", Interval: 1 min', caplog.record_tuples)
+    _clean_test_file(file)
+
+
+def test_tickerdata_to_dataframe_parallel(default_conf):
+    timerange = ((None, 'line'), None, -100)
+    tickerlist = {pair: load_tickerdata_file(None, pair, 1, timerange=timerange)
+                  for pair in ['BTC_UNITEST', 'BTC_ETH', 'BTC_LTC']}
+    expected = optimize.tickerdata_to_dataframe(tickerlist)
+    data = optimize.tickerdata_to_dataframe(tickerlist, jobs=2, config=default_conf)
+    assert list(data.keys()) == list(tickerlist.keys())
+    for pair, frame in data.items():
+        assert frame.equals(expected[pair])
+
+
 def test_trim_tickerlist():
     with open('freqtrade/tests/testdata/BTC_ETH-1.json') as data_file:
         ticker_list = json.load(data_file)
@@ -261,6 +337,27 @@ def test_trim_tickerlist():
     assert ticker_list[5] is ticker[0]  # The list starts at the index 5
     assert ticker_list[9] is ticker[-1]  # The list ends at the index 9 (5 elements)
 
+    # Test the pattern ^(\d{8})-(\d{8})$
+    # This pattern extract the candles of whole days
+    timerange = (('date', 'date'), '20180122', '20180123')
+    ticker = trim_tickerlist(ticker_list, timerange)
+
+    assert len(ticker) == 2 * 1440
+    assert ticker[0]['T'] == '2018-01-22T00:00:00'
+    assert ticker[-1]['T'] == '2018-01-23T23:59:00'
+
+    # Test the patterns ^-(\d{8})$ and ^(\d{8})-$
+    ticker = trim_tickerlist(ticker_list, ((None, 'date'), None, '20180121'))
+    assert ticker_list[0] is ticker[0]
+    assert ticker[-1]['T'] == '2018-01-21T23:59:00'
+    ticker = trim_tickerlist(ticker_list, (('date', None), '20180129', None))
+    assert ticker[0]['T'] == '2018-01-29T00:00:00'
+    assert ticker_list[-1] is ticker[-1]
+
+    # Dates outside of the ticker history
+    assert trim_tickerlist(ticker_list, (('date', None), '20180201', None)) == []
+    assert len(trim_tickerlist(ticker_list, ((None, 'date'), None, '20180201'))) == ticker_list_len
+
     # Test a wrong pattern
     # This pattern must return the list unchanged
     timerange = ((None, None), None, 5)
@@ -270,6 +367,20 @@ def test_trim_tickerlist():
     assert ticker_list_len == ticker_len
 
 
+def test_trim_tickerlist_columns():
+    timerange = (('date', 'date'), '20180122', '20180123')
+    tickerdata = load_tickerdata_file(None, 'BTC_ETH', 1)
+    with open('freqtrade/tests/testdata/BTC_ETH-1.json') as data_file:
+        expected = trim_tickerlist(json.load(data_file), timerange)
+
+    ticker = trim_tickerlist(tickerdata, timerange)
+    assert len(ticker) == len(expected)
+    assert ticker[0] == expected[0]
+    assert ticker[-1]['T'] == expected[-1]['T']
+    # load_tickerdata_file() trims the same candles
+    assert len(load_tickerdata_file(None, 'BTC_ETH', 1, timerange=timerange)) == len(expected)
+
+
 def test_file_dump_json():
     file = 'freqtrade/tests/testdata/test_{id}.json'.format(id=str(uuid.uuid4()))
     data = {'bar': 'foo'}
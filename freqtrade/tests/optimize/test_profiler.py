@@ -0,0 +1,86 @@
+# pragma pylint: disable=missing-docstring, C0103
+import json
+import logging
+from unittest.mock import MagicMock
+
+from freqtrade.optimize import backtesting, profiler
+from freqtrade.optimize.profiler import Profiler
+from freqtrade.tests.optimize.test_backtesting import mocked_load_data
+
+
+def test_profiler_phases():
+    prof = Profiler()
+    for pair in ['BTC_ETH', 'BTC_LTC', 'BTC_ETH']:
+        with prof.phase('indicators', pair) as stats:
+            stats.candles += 100
+    with prof.phase('simulation') as stats:
+        stats.candles += 300
+        stats.signals += 3
+
+    rows = prof.rows()
+    assert [(row['phase'], row['pair'], row['calls'], row['candles']) for row in rows] == [
+        ('indicators', 'BTC_ETH', 2, 200),
+        ('indicators', 'BTC_LTC', 1, 100),
+        ('indicators', 'ALL', 3, 300),
+        ('simulation', None, 1, 300),
+    ]
+    assert rows[3]['signals'] == 3
+    assert round(rows[2]['percent'] + rows[3]['percent']) == 100
+    assert rows[2]['seconds'] == rows[0]['seconds'] + rows[1]['seconds']
+
+    table = prof.generate_table().splitlines()
+    assert table[0].split() == ['phase', 'pair', 'calls', 'seconds', '%',
+                                'candles/s', 'signals/s']
+    assert len(table) == 2 + len(rows)
+
+
+def test_profiler_dump_json(tmpdir):
+    prof = Profiler()
+    with prof.phase('load_data', 'BTC_ETH') as stats:
+        stats.candles += 10
+    filename = str(tmpdir.join('profile.json'))
+    prof.dump_json(filename)
+    with open(filename) as file:
+        rows = json.load(file)
+    assert [(row['phase'], row['pair'], row['candles']) for row in rows] == [
+        ('load_data', 'BTC_ETH', 10)]
+
+
+def test_phase_disabled():
+    profiler.disable()
+    with profiler.phase('indicators', 'BTC_ETH') as stats:
+        stats.candles += 10
+    prof = profiler.enable()
+    with profiler.phase('indicators', 'BTC_ETH') as stats:
+        stats.candles += 20
+    profiler.disable()
+    assert [row['candles'] for row in prof.rows()] == [20]
+
+
+def test_backtest_start_profile(default_strategy, default_conf, mocker, caplog, tmpdir):
+    caplog.set_level(logging.INFO)
+    default_conf['exchange']['pair_whitelist'] = ['BTC_UNITEST']
+    mocker.patch.dict('freqtrade.main._CONF', default_conf)
+    mocker.patch('freqtrade.misc.load_config', new=lambda s: default_conf)
+    mocker.patch.multiple('freqtrade.optimize',
+                          load_data=mocked_load_data)
+    args = MagicMock()
+    args.ticker_interval = 1
+    args.level = 10
+    args.live = False
+    args.datadir = None
+    args.export = None
+    args.jobs = 1
+    args.timeline = False
+    args.profile = str(tmpdir.join('profile.json'))
+    args.timerange = '-100'  # needed due to MagicMock malleability
+    backtesting.start(args)
+
+    assert 'PROFILE' in caplog.text
+    with open(args.profile) as file:
+        rows = json.load(file)
+    phases = [row['phase'] for row in rows]
+    assert phases == ['indicators', 'buy signals', 'sell signals', 'simulation']
+    assert all(row['pair'] == 'BTC_UNITEST' and row['candles'] > 0 for row in rows)
+    # profiling is switched off again
+    assert profiler._PROFILER is None
@@ -0,0 +1,115 @@
+# pragma pylint: disable=missing-docstring, C0103
+import json
+import os
+import shutil
+
+import numpy as np
+
+from freqtrade import analyze
+from freqtrade.optimize import tickerdata
+from freqtrade.optimize.tickerdata import TickerColumns, cache_path, load_ticker_file
+
+_TESTDATA = 'freqtrade/tests/testdata/BTC_UNITEST-1.json'
+
+
+def _tickers():
+    with open(_TESTDATA) as file:
+        return json.load(file)
+
+
+def test_cache_path():
+    assert cache_path('data/BTC_ETH-5.json') == 'data/BTC_ETH-5.columns'
+    assert cache_path('data/BTC_ETH-5.json.gz') == 'data/BTC_ETH-5.columns'
+
+
+def test_ticker_columns():
+    tickers = _tickers()[:10]
+    ticker = TickerColumns.from_tickers(tickers)
+
+    assert len(ticker) == 10
+    assert ticker.columns['T'].dtype.name == 'int64'
+    assert ticker.columns['C'].dtype.name == 'float64'
+    assert len(ticker[2:5]) == 3
+    assert isinstance(ticker[2:5], TickerColumns)
+    for key in ['O', 'H', 'L', 'C', 'V', 'T', 'BV']:
+        assert ticker[3][key] == tickers[3][key]
+    assert [row['T'] for row in ticker] == [row['T'] for row in tickers]
+
+
+def test_ticker_columns_without_bv(ticker_history_without_bv):
+    ticker = TickerColumns.from_tickers(ticker_history_without_bv)
+    assert list(ticker) == ticker_history_without_bv
+    assert list(analyze.parse_ticker_dataframe(ticker).columns) == [
+        'open', 'high', 'low', 'close', 'volume', 'date']
+
+
+def test_parse_ticker_dataframe_columns():
+    tickers = _tickers()[:100]
+    expected = analyze.parse_ticker_dataframe(tickers)
+    frame = analyze.parse_ticker_dataframe(TickerColumns.from_tickers(tickers))
+
+    assert 'BV' not in frame
+    for column in ['date', 'open', 'high', 'low', 'close', 'volume']:
+        assert frame[column].equals(expected[column])
+
+
+def test_load_ticker_file(tmpdir, mocker):
+    filename = str(tmpdir.join('BTC_UNITEST-1.json'))
+    shutil.copyfile(_TESTDATA, filename)
+
+    # The first load converts the json file
+    ticker = load_ticker_file(filename)
+    assert isinstance(ticker, TickerColumns)
+    assert len(ticker) == len(_tickers())
+    assert os.path.isfile(os.path.join(cache_path(filename), 'meta.json'))
+
+    # The next loads read the cache only
+    load_json = mocker.spy(tickerdata, 'load_json')
+    cached = load_ticker_file(filename)
+    assert load_json.call_count == 0
+    assert (cached.dates == ticker.dates).all()
+    assert (cached.values == ticker.values).all()
+
+    # A changed json file rebuilds the cache
+    with open(filename, 'w') as file:
+        json.dump(_tickers()[:5], file)
+    assert len(load_ticker_file(filename)) == 5
+    assert load_json.call_count == 1
+    assert len(load_ticker_file(filename)) == 5
+    assert load_json.call_count == 1
+
+
+def test_load_ticker_file_memory_mapped(tmpdir):
+    filename = str(tmpdir.join('BTC_UNITEST-1.json'))
+    shutil.copyfile(_TESTDATA, filename)
+
+    for _ in range(2):
+        ticker = load_ticker_file(filename)
+        assert isinstance(ticker.dates, np.memmap)
+        assert isinstance(ticker.values, np.memmap)
+
+    # Slices and DataFrames are views of the mapped values
+    frame = analyze.parse_ticker_dataframe(ticker[-100:])
+    assert len(frame) == 100
+    for column in ['open', 'high', 'low', 'close', 'volume']:
+        assert np.shares_memory(frame[column].values, ticker.values)
+    # The mapping is copy-on-write, the cache file is left unchanged
+    frame.loc[0, 'close'] = 0
+    assert load_ticker_file(filename)[-100]['C'] == _tickers()[-100]['C']
+
+
+def test_load_ticker_file_empty(tmpdir):
+    filename = str(tmpdir.join('BTC_UNITEST-1.json'))
+    with open(filename, 'w') as file:
+        json.dump([], file)
+    assert load_ticker_file(filename) == []
+    assert not os.path.exists(cache_path(filename))
+
+
+def test_load_ticker_file_unwritable_cache(tmpdir, mocker, caplog):
+    filename = str(tmpdir.join('BTC_UNITEST-1.json'))
+    shutil.copyfile(_TESTDATA, filename)
+    mocker.patch('freqtrade.optimize.tickerdata.os.makedirs', side_effect=OSError('read-only'))
+
+    assert len(load_ticker_file(filename)) == len(_tickers())
+    assert 'Could not cache the ticker data' in caplog.text
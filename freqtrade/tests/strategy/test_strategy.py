@@ -1,6 +1,9 @@
 # pragma pylint: disable=missing-docstring, protected-access, C0103
 
 import logging
+
+import numpy as np
+
 from freqtrade.strategy.strategy import Strategy
 
 
@@ -93,6 +96,26 @@ def test_strategy_override_minimal_roi(caplog):
             ) in caplog.record_tuples
 
 
+def test_roi_lookup_arrays():
+    bounds, thresholds = Strategy.roi_lookup_arrays({0: 0.04, 20: 0.02, 30: 0.01, 40: 0.0})
+    minutes = np.array([0, 1, 20, 21, 30, 35, 41])
+    assert list(thresholds[bounds.searchsorted(minutes)]) == \
+        [np.inf, 0.04, 0.04, 0.02, 0.02, 0.01, 0.0]
+
+
+def test_strategy_roi_table_follows_minimal_roi():
+    strategy = Strategy()
+    strategy.init({'strategy': 'default_strategy', 'minimal_roi': {"10": 0.1, "0": 0.5}})
+    bounds, thresholds = strategy.roi_table
+    assert list(bounds) == [0, 10]
+    assert list(thresholds) == [np.inf, 0.5, 0.1]
+
+    strategy.minimal_roi = {0: 0.3}
+    bounds, thresholds = strategy.roi_table
+    assert list(bounds) == [0]
+    assert list(thresholds) == [np.inf, 0.3]
+
+
 def test_strategy_override_stoploss(caplog):
     caplog.set_level(logging.INFO)
     config = {
@@ -12,9 +12,11 @@ import freqtrade.main as main
 from freqtrade import DependencyException, OperationalException
 from freqtrade.exchange import Exchanges
 from freqtrade.main import (_process, check_handle_timedout, create_trade,
-                            execute_sell, get_target_bid, handle_trade, init)
+                            execute_sell, get_target_bid, handle_trade, init,
+                            min_roi_reached)
 from freqtrade.misc import State, get_state
 from freqtrade.persistence import Trade
+from freqtrade.strategy.strategy import StrategyParameters
 from freqtrade.tests.conftest import log_has
 
 
@@ -359,6 +361,31 @@ def test_handle_overlpapping_signals(default_conf, ticker, mocker):
     assert handle_trade(trades[0], int(default_conf['ticker_interval'])) is True
 
 
+def test_min_roi_reached(default_strategy):
+    # The Strategy singleton is shared by every test, the ROI table is passed instead
+    strategy = StrategyParameters({0: 0.04, 20: 0.02, 30: 0.01, 40: 0.0},
+                                  default_strategy.stoploss)
+    open_date = arrow.utcnow().shift(minutes=-60).datetime
+    trade = MagicMock(open_date=open_date, calc_profit_percent=MagicMock(return_value=0.03))
+
+    def roi_reached(minutes):
+        current_time = arrow.get(open_date).shift(minutes=minutes).datetime
+        return min_roi_reached(trade, 1.0, current_time, strategy)
+
+    assert not roi_reached(0)
+    assert not roi_reached(1)
+    assert roi_reached(21)
+
+    trade.calc_profit_percent.return_value = 0.015
+    assert not roi_reached(20)
+    assert not roi_reached(30)
+    assert roi_reached(31)
+
+    # stoploss
+    trade.calc_profit_percent.return_value = strategy.stoploss - 0.01
+    assert roi_reached(0)
+
+
 def test_handle_trade_roi(default_conf, ticker, mocker, caplog):
     caplog.set_level(logging.DEBUG)
     default_conf.update({'experimental': {'use_sell_signal': True}})
@@ -1,6 +1,8 @@
 # pragma pylint: disable=missing-docstring,C0103
 import argparse
 import json
+import subprocess
+import sys
 import time
 from copy import deepcopy
 from unittest.mock import MagicMock
@@ -9,7 +11,7 @@ import datetime
 import pytest
 from jsonschema import ValidationError
 from freqtrade.analyze import parse_ticker_dataframe
-from freqtrade.misc import (common_args_parser, file_dump_json, load_config,
+from freqtrade.misc import (JsonLinesWriter, common_args_parser, file_dump_json, load_config,
                             parse_args, parse_timerange, throttle, datesarray_to_datetimearray)
 
 
@@ -114,7 +116,8 @@ def test_parse_args_backtesting_custom():
         'backtesting',
         '--live',
         '--ticker-interval', '1',
-        '--refresh-pairs-cached']
+        '--refresh-pairs-cached',
+        '--jobs', '4']
     call_args = parse_args(args, '')
     assert call_args.config == 'test_conf.json'
     assert call_args.live is True
@@ -123,13 +126,29 @@ def test_parse_args_backtesting_custom():
     assert call_args.func is not None
     assert call_args.ticker_interval == 1
     assert call_args.refresh_pairs is True
+    assert call_args.jobs == 4
+
+
+def test_parse_args_imports_no_subcommand():
+    # run in a new interpreter, the tests have already imported everything
+    code = ('import sys\n'
+            'from freqtrade.main import parse_args\n'
+            'parse_args(["hyperopt"], "")\n'
+            'print(",".join(module for module in ["freqtrade.optimize", "hyperopt", "telegram"]'
+            ' if module in sys.modules))')
+    assert subprocess.check_output([sys.executable, '-c', code]).strip() == b''
 
 
 def test_parse_args_hyperopt_custom():
-    args = ['-c', 'test_conf.json', 'hyperopt', '--epochs', '20']
+    args = ['-c', 'test_conf.json', 'hyperopt', '--epochs', '20', '--jobs', '4',
+            '--halving', '3', '--batch', '50', '--progress', '10']
     call_args = parse_args(args, '')
     assert call_args.config == 'test_conf.json'
     assert call_args.epochs == 20
+    assert call_args.jobs == 4
+    assert call_args.halving == 3
+    assert call_args.batch == 50
+    assert call_args.progress == 10
     assert call_args.loglevel == 20
     assert call_args.subparser == 'hyperopt'
     assert call_args.func is not None
@@ -143,6 +162,20 @@ def test_file_dump_json(mocker):
     assert json_dump.call_count == 1
 
 
+def test_json_lines_writer(tmpdir):
+    filename = str(tmpdir.join('somefile.jsonl'))
+    with JsonLinesWriter(filename, batch_size=2) as writer:
+        writer.write([1, 'a'])
+        with open(filename) as file:
+            assert file.read() == ''
+        writer.write({'b': 2.5})
+        with open(filename) as file:
+            assert file.read() == '[1, "a"]\n{"b": 2.5}\n'
+        writer.write(3)
+    with open(filename) as file:
+        assert [json.loads(line) for line in file] == [[1, 'a'], {'b': 2.5}, 3]
+
+
 def test_parse_timerange_incorrect():
     assert ((None, 'line'), None, -200) == parse_timerange('-200')
     assert (('line', None), 200, None) == parse_timerange('200-')
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Measures the backtest time per candle on synthetic sine wave ticker data of growing
+length, with a buy signal on every other candle. The simulation is linear when the
+time per candle stays flat, a quadratic one would grow with the candle count.
+
+Usage: python3 scripts/benchmark_backtest.py [-c config.json] [--candles 2500,20000]
+"""
+import argparse
+import math
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from pandas import DataFrame
+from tabulate import tabulate
+
+from freqtrade import main as bot, misc, optimize
+from freqtrade.optimize.backtesting import backtest
+from freqtrade.strategy.strategy import Strategy
+
+
+def sine_ticks(count: int) -> list:
+    start = datetime(2017, 11, 1)
+    return [{'T': (start + timedelta(minutes=x)).strftime('%Y-%m-%dT%H:%M:%S'),
+             'V': 1.0,
+             'O': math.sin(x * 0.1) / 1000 + 0.001,
+             'H': math.sin(x * 0.1) / 1000 + 0.0011,
+             'L': math.sin(x * 0.1) / 1000 + 0.0009,
+             'C': math.sin(x * 0.1) / 1000 + 0.001} for x in range(count)]
+
+
+def alternate_signals(dataframe: DataFrame) -> DataFrame:
+    """ Buys on the even candles and sells on the odd ones """
+    buy = np.arange(len(dataframe)) % 2 == 0
+    dataframe['buy'] = buy.astype(float)
+    dataframe['sell'] = (~buy).astype(float)
+    return dataframe
+
+
+def time_per_candle(config: dict, count: int, repeat: int) -> list:
+    """ :return: row of candles, trades, best seconds and microseconds per candle """
+    args = {'stake_amount': config['stake_amount'],
+            'processed': optimize.preprocess({'BTC_UNITEST': sine_ticks(count)}),
+            'realistic': False,
+            'populate_buy_trend': alternate_signals,
+            'populate_sell_trend': alternate_signals}
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = backtest(args)
+        timings.append(time.perf_counter() - start)
+    return [count, len(results), min(timings), min(timings) / count * 10 ** 6]
+
+
+def main(sysargv) -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the backtest scaling')
+    parser.add_argument('-c', '--config', default='config.json', dest='config',
+                        help='config of the strategy (default: %(default)s)')
+    parser.add_argument('--candles', default='2500,20000', dest='candles',
+                        help='comma separated candle counts (default: %(default)s)')
+    parser.add_argument('--repeat', default=3, type=int, dest='repeat',
+                        help='runs per candle count (default: %(default)d)')
+    args = parser.parse_args(sysargv)
+
+    config = misc.load_config(args.config)
+    bot._CONF = config
+    Strategy().init(config)
+    rows = [time_per_candle(config, int(count), args.repeat)
+            for count in args.candles.split(',')]
+    print(tabulate(rows, headers=['candles', 'trades', 'min s', 'us/candle'],
+                   floatfmt='.3f'))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Measures the startup latency of freqtrade in fresh interpreters:
+ - help: `freqtrade --help`
+ - bot init: imports, argument parsing, config, rpc, persistence and strategy
+   initialization of the trading bot (everything before the exchange is contacted)
+The heavy optional modules loaded by each step are listed, the trading bot
+should not load the backtesting and hyperopt dependencies.
+
+Usage: python3 scripts/benchmark_startup.py [-c config.json] [--repeat 5]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from tabulate import tabulate
+
+# Modules the trading bot does not need
+HEAVY_MODULES = ['freqtrade.optimize', 'hyperopt', 'sklearn', 'scipy', 'telegram',
+                 'user_data.hyperopt_conf']
+
+HELP = '''
+from freqtrade.main import main
+try:
+    main(['--help'])
+except SystemExit:
+    pass
+'''
+
+BOT_INIT = '''
+from freqtrade import misc, persistence, rpc
+from freqtrade.main import parse_args
+from freqtrade.strategy.strategy import Strategy
+args = parse_args(['-c', {config!r}], '')
+config = misc.load_config(args.config)
+config['telegram']['enabled'] = False
+rpc.init(config)
+persistence.init(config, 'sqlite://')
+Strategy().init(config)
+'''
+
+REPORT = '''
+import json, sys
+print(json.dumps([module for module in {modules!r} if module in sys.modules]))
+'''
+
+
+def measure(code: str) -> dict:
+    """
+    Runs code in a new interpreter
+    :return: dict with the wall clock seconds and the HEAVY_MODULES it loaded
+    """
+    start = time.perf_counter()
+    output = subprocess.check_output(
+        [sys.executable, '-c', code + REPORT.format(modules=HEAVY_MODULES)],
+        stderr=subprocess.DEVNULL)
+    seconds = time.perf_counter() - start
+    return {'seconds': seconds, 'modules': json.loads(output.decode().splitlines()[-1])}
+
+
+def benchmark(config: str, repeat: int) -> list:
+    """ :return: one row per step: step, median seconds, min seconds, heavy modules """
+    rows = []
+    for step, code in [('help', HELP), ('bot init', BOT_INIT.format(config=config))]:
+        runs = [measure(code) for _ in range(repeat)]
+        seconds = [run['seconds'] for run in runs]
+        rows.append([step, statistics.median(seconds), min(seconds),
+                     ', '.join(runs[-1]['modules'])])
+    return rows
+
+
+def main(sysargv) -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the freqtrade startup')
+    parser.add_argument('-c', '--config', default='config.json', dest='config',
+                        help='config of the bot init step (default: %(default)s)')
+    parser.add_argument('--repeat', default=5, type=int, dest='repeat',
+                        help='runs per step (default: %(default)d)')
+    args = parser.parse_args(sysargv)
+    print(tabulate(benchmark(args.config, args.repeat),
+                   headers=['step', 'median s', 'min s', 'heavy modules loaded'],
+                   floatfmt='.3f'))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
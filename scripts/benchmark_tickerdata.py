@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Compares the loading of ticker data files into DataFrames:
+ - json: json.load() of the {pair}-{interval}.json(.gz) file and parse_ticker_dataframe()
+   of the list of dicts, the loading path before the columnar cache
+ - columns: optimize.load_tickerdata_file() reading the columnar cache of the file
+   (built beforehand) and parse_ticker_dataframe() of the columns
+
+Usage: python3 scripts/benchmark_tickerdata.py [--datadir path] [-i 5] [-p BTC_ETH,BTC_LTC]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from tabulate import tabulate
+
+from freqtrade import analyze, optimize
+from freqtrade.optimize import tickerdata
+
+
+def source_file(datadir: str, pair: str, interval: int) -> str:
+    """ :return: the file load_tickerdata_file() would read """
+    file = os.path.join(optimize.make_testdata_path(datadir),
+                        '{pair}-{interval}.json'.format(pair=pair, interval=interval))
+    return file + '.gz' if os.path.isfile(file + '.gz') else file
+
+
+def load_json(datadir: str, pair: str, interval: int):
+    return analyze.parse_ticker_dataframe(
+        tickerdata.load_json(source_file(datadir, pair, interval)))
+
+
+def load_columns(datadir: str, pair: str, interval: int):
+    return analyze.parse_ticker_dataframe(
+        optimize.load_tickerdata_file(datadir, pair, interval))
+
+
+def measure(load, datadir: str, pairs: list, interval: int, repeat: int) -> list:
+    """ :return: wall clock seconds of each run loading all pairs """
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for pair in pairs:
+            load(datadir, pair, interval)
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def main(sysargv) -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the loading of ticker data')
+    parser.add_argument('--datadir', default=None, dest='datadir',
+                        help='path to the ticker data (default: freqtrade/tests/testdata)')
+    parser.add_argument('-i', '--ticker-interval', default=1, type=int, dest='interval',
+                        help='ticker interval in minutes (default: %(default)d)')
+    parser.add_argument('-p', '--pairs', default=None, dest='pairs',
+                        help='comma separated pairs (default: all pairs of the interval)')
+    parser.add_argument('--repeat', default=3, type=int, dest='repeat',
+                        help='runs per loader (default: %(default)d)')
+    args = parser.parse_args(sysargv)
+
+    path = optimize.make_testdata_path(args.datadir)
+    suffix = '-{}.json'.format(args.interval)
+    pairs = args.pairs.split(',') if args.pairs else sorted(
+        {name[:name.index(suffix)] for name in os.listdir(path) if suffix in name})
+    pairs = [pair for pair in pairs if optimize.load_tickerdata_file(args.datadir, pair,
+                                                                     args.interval)]
+    candles = sum(len(optimize.load_tickerdata_file(args.datadir, pair, args.interval))
+                  for pair in pairs)
+
+    rows = []
+    for loader, load in [('json', load_json), ('columns', load_columns)]:
+        runs = measure(load, args.datadir, pairs, args.interval, args.repeat)
+        rows.append([loader, len(pairs), candles, statistics.median(runs), min(runs),
+                     candles / statistics.median(runs)])
+    print(tabulate(rows, headers=['loader', 'pairs', 'candles', 'median s', 'min s',
+                                  'candles/s'],
+                   floatfmt='.3f'))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
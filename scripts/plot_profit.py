@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 
-import sys
 import json
+import os
+import sys
 import numpy as np
 
 from plotly import tools
@@ -21,8 +22,23 @@ def plot_parse_args(args):
     return parser.parse_args(args)
 
 
-# data:: [ pair,      profit-%,  enter,         exit,        time, duration]
-# data:: ['BTC_XMR', 0.00537847, '1511176800', '1511178000', 5057, 1]
+def load_backtest_records(filename):
+    """
+    Reads the trades exported by backtesting --export trades one line at a time.
+    Exports of older versions (one json list) are read as a whole.
+    :return: generator of trade records
+    """
+    with open(filename) as file:
+        if filename.endswith('.json'):
+            yield from json.load(file)
+            return
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+# data:: [ pair,      profit-%,  enter,      exit,       time, duration]
+# data:: ['BTC_XMR', 0.00537847, 1511176800, 1511178000, 5057, 1]
 # FIX: make use of the enter/exit dates to insert the
 # profit more precisely into the pg array
 def make_profit_array(data, px, filter_pairs=[]):
@@ -114,10 +130,11 @@ def plot_profit(args) -> None:
     # Load the profits results
     # And make an profits-growth array
 
-    filename = 'backtest-result.json'
-    with open(filename) as file:
-        data = json.load(file)
-    pg = make_profit_array(data, max_x, filter_pairs)
+    filename = 'backtest-result.jsonl'
+    if not os.path.exists(filename):
+        filename = 'backtest-result.json'
+    # The records are streamed, the file is read again for each profit array
+    pg = make_profit_array(load_backtest_records(filename), max_x, filter_pairs)
 
     #
     # Plot the pairs average close prices, and total profit growth
@@ -140,7 +157,7 @@ def plot_profit(args) -> None:
     fig.append_trace(profit, 2, 1)
 
     for pair in pairs:
-        pg = make_profit_array(data, max_x, pair)
+        pg = make_profit_array(load_backtest_records(filename), max_x, pair)
         pair_profit = go.Scattergl(
             x=dates,
             y=pg,